@@ -4,15 +4,21 @@ This script queries the AWS documentation RAG system to answer questions.
 """
 
 import os
+import orjson
+import sqlite3
+import time
 from pathlib import Path
-from typing import List, Dict, Optional
-from langchain.vectorstores import Chroma, FAISS
+from typing import Awaitable, Callable, List, Dict, Optional
+import faiss
+import numpy as np
+from langchain.vectorstores import FAISS
 from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings
 from langchain.chains import RetrievalQA
 from langchain.llms import OpenAI, HuggingFacePipeline
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.schema import Document
+from aws_rag_setup import build_cached_embeddings, open_chroma_store
 
 
 class AWSDocRAGQuery:
@@ -28,7 +34,8 @@ class AWSDocRAGQuery:
         collection_name: str = "aws_docs",
         llm_model: str = "gpt-3.5-turbo",
         temperature: float = 0.0,
-        k: int = 4  # Number of documents to retrieve
+        k: int = 4,  # Number of documents to retrieve
+        embedding_cache_dir: Optional[str] = "data/emb_cache"
     ):
         """
         Initialize AWS RAG Query system
@@ -43,6 +50,8 @@ class AWSDocRAGQuery:
             llm_model: LLM model name
             temperature: Temperature for LLM
             k: Number of documents to retrieve
+            embedding_cache_dir: Directory for the on-disk embedding cache shared with
+                AWSDocRAGSetup (None disables it)
         """
         self.vector_store_path = Path(vector_store_path)
         self.k = k
@@ -53,19 +62,21 @@ class AWSDocRAGQuery:
                 raise ValueError("OpenAI API key required when use_openai=True")
             os.environ["OPENAI_API_KEY"] = openai_api_key
             self.embeddings = OpenAIEmbeddings()
+            embedding_model = self.embeddings.model
         else:
             self.embeddings = HuggingFaceEmbeddings(
                 model_name=embedding_model,
                 model_kwargs={'device': 'cpu'}
             )
         
+        # Repeated questions skip the embedding model on later runs
+        if embedding_cache_dir:
+            self.embeddings = build_cached_embeddings(self.embeddings, embedding_model, embedding_cache_dir)
+        
         # Load vector store
         if use_chroma:
-            self.vectorstore = Chroma(
-                persist_directory=str(self.vector_store_path),
-                embedding_function=self.embeddings,
-                collection_name=collection_name
-            )
+            # Queries are normalized like the stored documents
+            self.vectorstore = open_chroma_store(self.vector_store_path, collection_name, self.embeddings)
         else:
             self.vectorstore = FAISS.load_local(
                 str(self.vector_store_path),
@@ -132,6 +143,22 @@ Answer: Provide a detailed, accurate answer based on the AWS documentation conte
             "source_documents": result["source_documents"]
         }
     
+    async def aquery(self, question: str) -> Dict:
+        """
+        Query the RAG system without blocking the event loop
+        
+        Args:
+            question: Question to ask about AWS documentation
+            
+        Returns:
+            Dictionary with answer and source documents
+        """
+        result = await self.qa_chain.ainvoke({"query": question})
+        return {
+            "answer": result["result"],
+            "source_documents": result["source_documents"]
+        }
+    
     def retrieve_documents(self, query: str, k: Optional[int] = None) -> List[Document]:
         """
         Retrieve relevant documents without generating answer
@@ -147,6 +174,20 @@ Answer: Provide a detailed, accurate answer based on the AWS documentation conte
         docs = self.vectorstore.similarity_search(query, k=k)
         return docs
     
+    async def aretrieve_documents(self, query: str, k: Optional[int] = None) -> List[Document]:
+        """
+        Retrieve relevant documents without blocking the event loop
+        
+        Args:
+            query: Query string
+            k: Number of documents to retrieve (uses self.k if None)
+            
+        Returns:
+            List of relevant documents
+        """
+        k = k or self.k
+        return await self.vectorstore.asimilarity_search(query, k=k)
+    
     def query_with_sources(self, question: str) -> str:
         """
         Query and return formatted answer with sources
@@ -170,6 +211,160 @@ Answer: Provide a detailed, accurate answer based on the AWS documentation conte
         return response
 
 
+class SemanticQueryCache:
+    """Cache RAG answers by question meaning rather than exact text
+    
+    Question embeddings are hashed with random-hyperplane LSH (faiss.IndexLSH) to
+    find candidate near-duplicates cheaply; a candidate is a hit only if its exact
+    cosine similarity clears the threshold. Answers and sources live in a SQLite
+    sidecar keyed by the same integer id as the LSH index.
+    """
+    
+    def __init__(
+        self,
+        embeddings,
+        cache_path: str = "data/semantic_cache",
+        threshold: float = 0.95,
+        max_entries: int = 10_000,
+        nbits: int = 256,
+        candidates: int = 8
+    ):
+        """
+        Initialize the semantic cache
+        
+        Args:
+            embeddings: Embeddings used to embed questions (ideally the disk-cached ones)
+            cache_path: Path prefix for the .faiss index and .sqlite sidecar
+            threshold: Minimum cosine similarity for a cached answer to be reused
+            max_entries: Entries kept before least-recently-used eviction
+            nbits: LSH signature length in bits
+            candidates: LSH neighbours checked with exact cosine similarity
+        """
+        self.embeddings = embeddings
+        self.cache_path = cache_path
+        self.index_path = f"{cache_path}.faiss"
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.nbits = nbits
+        self.candidates = candidates
+        self._db = None
+        
+        # The index is created on the first insert, once the embedding size is known
+        self.index = faiss.read_index(self.index_path) if os.path.exists(self.index_path) else None
+    
+    @property
+    def db(self) -> sqlite3.Connection:
+        """SQLite sidecar, opened on first use so an unused cache leaves no files behind"""
+        if self._db is None:
+            Path(self.cache_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(f"{self.cache_path}.sqlite")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "id INTEGER PRIMARY KEY, question TEXT, answer TEXT, sources TEXT, "
+                "vector BLOB, last_used REAL)"
+            )
+        return self._db
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype="float32")
+        return vector / (np.linalg.norm(vector) or 1.0)
+    
+    def _lookup(self, vector: np.ndarray) -> Optional[Dict]:
+        if self.index is None or self.index.ntotal == 0:
+            return None
+        
+        _, ids = self.index.search(vector[None, :], min(self.candidates, self.index.ntotal))
+        ids = [int(i) for i in ids[0] if i != -1]
+        if not ids:
+            return None
+        
+        rows = self.db.execute(
+            f"SELECT id, answer, sources, vector FROM entries WHERE id IN ({','.join('?' * len(ids))})",
+            ids
+        ).fetchall()
+        best, best_score = None, self.threshold
+        for row in rows:
+            score = float(np.dot(vector, np.frombuffer(row[3], dtype="float32")))
+            if score >= best_score:
+                best, best_score = row, score
+        if best is None:
+            return None
+        
+        self.db.execute("UPDATE entries SET last_used = ? WHERE id = ?", (time.time(), best[0]))
+        self.db.commit()
+        return {
+            "answer": best[1],
+            "source_documents": [Document(**doc) for doc in orjson.loads(best[2])]
+        }
+    
+    def _store(self, question: str, vector: np.ndarray, result: Dict):
+        sources = orjson.dumps([
+            {"page_content": doc.page_content, "metadata": doc.metadata}
+            for doc in result["source_documents"]
+        ], default=str).decode()
+        cursor = self.db.execute(
+            "INSERT INTO entries (question, answer, sources, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+            (question, result["answer"], sources, vector.tobytes(), time.time())
+        )
+        
+        if self.index is None:
+            self.index = faiss.IndexIDMap(faiss.IndexLSH(len(vector), self.nbits))
+        self.index.add_with_ids(vector[None, :], np.array([cursor.lastrowid], dtype="int64"))
+        
+        # Evict least recently used entries beyond the cap
+        overflow = self.index.ntotal - self.max_entries
+        if overflow > 0:
+            stale = [row[0] for row in self.db.execute(
+                "SELECT id FROM entries ORDER BY last_used LIMIT ?", (overflow,)
+            )]
+            self.index.remove_ids(faiss.IDSelectorBatch(np.array(stale, dtype="int64")))
+            self.db.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in stale])
+        
+        self.db.commit()
+        faiss.write_index(self.index, self.index_path)
+    
+    def get_or_compute(self, question: str, compute: Callable[[], Dict]) -> Dict:
+        """
+        Return a cached result for a semantically equivalent question, or compute and cache it
+        
+        Args:
+            question: Question being asked
+            compute: Produces the result on a miss, e.g. lambda: rag_query.query(question)
+            
+        Returns:
+            Dictionary with answer and source documents, as AWSDocRAGQuery.query returns
+        """
+        vector = self._normalize(self.embeddings.embed_query(question))
+        cached = self._lookup(vector)
+        if cached is not None:
+            return cached
+        
+        result = compute()
+        self._store(question, vector, result)
+        return result
+    
+    async def aget_or_compute(self, question: str, compute: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Async variant of get_or_compute
+        
+        Args:
+            question: Question being asked
+            compute: Coroutine factory producing the result on a miss, e.g. lambda: rag_query.aquery(question)
+            
+        Returns:
+            Dictionary with answer and source documents, as AWSDocRAGQuery.aquery returns
+        """
+        vector = self._normalize(await self.embeddings.aembed_query(question))
+        cached = self._lookup(vector)
+        if cached is not None:
+            return cached
+        
+        result = await compute()
+        self._store(question, vector, result)
+        return result
+
+
 def main():
     """Example usage"""
     # Initialize RAG query system
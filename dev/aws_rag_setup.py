@@ -5,12 +5,16 @@ This script sets up a RAG (Retrieval Augmented Generation) system for AWS docume
 
 import os
 import json
+import hashlib
+import mmap
 import requests
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.vectorstores import Chroma, FAISS
-from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings
+from langchain.embeddings import HuggingFaceEmbeddings, OpenAIEmbeddings, CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain.document_loaders import (
     TextLoader,
     PyPDFLoader,
@@ -19,10 +23,97 @@ from langchain.document_loaders import (
     UnstructuredMarkdownLoader
 )
 from langchain.schema import Document
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.embeddings import Embeddings
 import chromadb
 from chromadb.config import Settings
 
 
+# Text files above this size are memory-mapped rather than read into a buffer
+MMAP_THRESHOLD_BYTES = 1 << 20  # 1 MiB
+
+# Chroma collections score by inner product over unit-length vectors (== cosine)
+CHROMA_SPACE = "ip"
+
+
+class MmapTextLoader(BaseLoader):
+    """Load a large plain-text file through mmap
+    
+    The text is decoded straight from the mapped pages, which skips the
+    intermediate bytes object a buffered read would allocate. The decoded
+    str is still a full copy of the file.
+    """
+    
+    def __init__(self, file_path: str, encoding: str = "utf-8"):
+        self.file_path = file_path
+        self.encoding = encoding
+    
+    def lazy_load(self) -> Iterator[Document]:
+        with open(self.file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, self.encoding, "replace")
+        yield Document(page_content=text, metadata={"source": self.file_path})
+
+
+def _mmap_large_files(loader_cls):
+    """Loader factory for plain-text files: MmapTextLoader above the threshold, loader_cls otherwise"""
+    def make_loader(file_path: str, **loader_kwargs):
+        if os.path.getsize(file_path) > MMAP_THRESHOLD_BYTES:
+            return MmapTextLoader(file_path)
+        return loader_cls(file_path, **loader_kwargs)
+    return make_loader
+
+
+class NormalizedEmbeddings(Embeddings):
+    """Wrap embeddings so every document and query vector is unit-length
+    
+    Chroma collections use the inner-product space, which only ranks like
+    cosine similarity when both sides are normalized the same way.
+    """
+    
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+    
+    @staticmethod
+    def _normalize(vectors) -> List[List[float]]:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors.tolist()
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._normalize(self.embeddings.embed_documents(texts))
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self._normalize([self.embeddings.embed_query(text)])[0]
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._normalize(await self.embeddings.aembed_documents(texts))
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        return self._normalize([await self.embeddings.aembed_query(text)])[0]
+
+
+def open_chroma_store(vector_store_path: str, collection_name: str, embeddings: Embeddings) -> Chroma:
+    """
+    Open a persisted Chroma collection for querying
+    
+    Raises:
+        ValueError: If the collection was built with a distance other than CHROMA_SPACE
+    """
+    client = chromadb.PersistentClient(path=str(vector_store_path))
+    collection = client.get_or_create_collection(name=collection_name, metadata={"hnsw:space": CHROMA_SPACE})
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    if space != CHROMA_SPACE:
+        raise ValueError(
+            f"Chroma collection '{collection_name}' uses hnsw:space={space!r}, expected {CHROMA_SPACE!r}; "
+            "rebuild it with AWSDocRAGSetup.create_vector_store"
+        )
+    return Chroma(
+        client=client,
+        collection_name=collection_name,
+        embedding_function=NormalizedEmbeddings(embeddings)
+    )
+
+
 class AWSDocRAGSetup:
     """Class to handle AWS documentation RAG setup"""
     
@@ -34,7 +125,8 @@ class AWSDocRAGSetup:
         use_openai: bool = False,
         openai_api_key: Optional[str] = None,
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        embedding_cache_dir: Optional[str] = "data/emb_cache"
     ):
         """
         Initialize AWS RAG Setup
@@ -47,6 +139,7 @@ class AWSDocRAGSetup:
             openai_api_key: OpenAI API key if using OpenAI embeddings
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
+            embedding_cache_dir: Directory for the on-disk embedding cache (None disables it)
         """
         self.docs_directory = Path(docs_directory)
         self.vector_store_path = Path(vector_store_path)
@@ -63,12 +156,18 @@ class AWSDocRAGSetup:
                 raise ValueError("OpenAI API key required when use_openai=True")
             os.environ["OPENAI_API_KEY"] = openai_api_key
             self.embeddings = OpenAIEmbeddings()
+            embedding_model = self.embeddings.model
         else:
             self.embeddings = HuggingFaceEmbeddings(
                 model_name=embedding_model,
-                model_kwargs={'device': 'cpu'}  # Use 'cuda' if GPU available
+                model_kwargs={'device': 'cpu'},  # Use 'cuda' if GPU available
+                encode_kwargs={'batch_size': 128}  # Larger encode batches keep the model busy
             )
         
+        # Reuse embeddings across runs instead of re-embedding unchanged chunks
+        if embedding_cache_dir:
+            self.embeddings = build_cached_embeddings(self.embeddings, embedding_model, embedding_cache_dir)
+        
         # Initialize text splitter
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
@@ -123,7 +222,8 @@ class AWSDocRAGSetup:
                 str(self.docs_directory),
                 glob=f"**/*{ext}",
                 loader_cls={
-                    ".txt": TextLoader,
+                    ".txt": _mmap_large_files(TextLoader),
+                    # Markdown always goes through its parser, so large files embed the same text
                     ".md": UnstructuredMarkdownLoader,
                     ".pdf": PyPDFLoader
                 }.get(ext, TextLoader)
@@ -153,7 +253,8 @@ class AWSDocRAGSetup:
         self,
         documents: List[Document],
         use_chroma: bool = True,
-        collection_name: str = "aws_docs"
+        collection_name: str = "aws_docs",
+        batch_size: int = 256
     ):
         """
         Create vector store from documents
@@ -162,24 +263,70 @@ class AWSDocRAGSetup:
             documents: List of Document objects (should be chunked)
             use_chroma: Whether to use ChromaDB (True) or FAISS (False)
             collection_name: Name of ChromaDB collection
+            batch_size: Chunks embedded and written per call
         """
         print(f"Creating vector store from {len(documents)} documents...")
         
+        # Each batch is one embed_documents call, so request overhead is amortized
+        # while memory and Chroma's per-call insert limit stay bounded
         if use_chroma:
-            # Create ChromaDB vector store
-            vectorstore = Chroma.from_documents(
-                documents=documents,
-                embedding=self.embeddings,
-                persist_directory=str(self.vector_store_path),
-                collection_name=collection_name
+            # Create the ChromaDB collection directly so batches go through chromadb's
+            # public upsert; vectors are stored unit-length, so inner product ranks the
+            # same as cosine similarity
+            client = chromadb.PersistentClient(path=str(self.vector_store_path))
+            collection = client.get_or_create_collection(
+                name=collection_name,
+                metadata={"hnsw:space": CHROMA_SPACE}
+            )
+            # get_or_create_collection keeps an existing collection's metric, so a store
+            # persisted with another space (Chroma's default is l2) is rebuilt from scratch
+            space = (collection.metadata or {}).get("hnsw:space", "l2")
+            if space != CHROMA_SPACE:
+                print(f"Recreating collection '{collection_name}' (hnsw:space={space}, need {CHROMA_SPACE})")
+                client.delete_collection(collection_name)
+                collection = client.create_collection(
+                    name=collection_name,
+                    metadata={"hnsw:space": CHROMA_SPACE}
+                )
+            embeddings = NormalizedEmbeddings(self.embeddings)
+            
+            # Content-derived ids make rebuilds overwrite chunks instead of duplicating them;
+            # identical chunks collapse to one entry
+            unique_chunks = {}
+            for doc in documents:
+                chunk_id = hashlib.blake2b(doc.page_content.encode("utf-8"), digest_size=8).hexdigest()
+                unique_chunks.setdefault(chunk_id, doc)
+            ids = list(unique_chunks)
+            chunks = list(unique_chunks.values())
+            
+            for start in range(0, len(chunks), batch_size):
+                batch_ids = ids[start:start + batch_size]
+                batch = chunks[start:start + batch_size]
+                texts = [doc.page_content for doc in batch]
+                
+                # One bulk write per batch
+                collection.upsert(
+                    ids=batch_ids,
+                    embeddings=embeddings.embed_documents(texts),
+                    metadatas=[doc.metadata for doc in batch],
+                    documents=texts
+                )
+            
+            vectorstore = Chroma(
+                client=client,
+                collection_name=collection_name,
+                embedding_function=embeddings
             )
             print(f"ChromaDB vector store created at {self.vector_store_path}")
         else:
             # Create FAISS vector store
+            batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
             vectorstore = FAISS.from_documents(
-                documents=documents,
+                documents=batches[0] if batches else documents,
                 embedding=self.embeddings
             )
+            for batch in batches[1:]:
+                vectorstore.add_documents(batch)
             vectorstore.save_local(str(self.vector_store_path))
             print(f"FAISS vector store saved at {self.vector_store_path}")
         
@@ -197,11 +344,7 @@ class AWSDocRAGSetup:
             Vector store object
         """
         if use_chroma:
-            vectorstore = Chroma(
-                persist_directory=str(self.vector_store_path),
-                embedding_function=self.embeddings,
-                collection_name=collection_name
-            )
+            vectorstore = open_chroma_store(self.vector_store_path, collection_name, self.embeddings)
         else:
             vectorstore = FAISS.load_local(
                 str(self.vector_store_path),
@@ -212,6 +355,30 @@ class AWSDocRAGSetup:
         return vectorstore
 
 
+def build_cached_embeddings(embeddings, model_name: str, cache_dir: str = "data/emb_cache") -> CacheBackedEmbeddings:
+    """
+    Wrap embeddings in a persistent on-disk cache
+    
+    Args:
+        embeddings: Underlying embeddings model
+        model_name: Model name, part of every key so models never share vectors
+        cache_dir: Directory for the cached vectors
+        
+    Returns:
+        Embeddings that only call the model for texts not seen before
+    """
+    def key_encoder(text: str) -> str:
+        # sha256 of model name + text, truncated to 16 bytes for compact filenames
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()[:32]
+    
+    return CacheBackedEmbeddings.from_bytes_store(
+        embeddings,
+        LocalFileStore(cache_dir),
+        query_embedding_cache=True,  # Cache query embeddings too, not just documents
+        key_encoder=key_encoder
+    )
+
+
 def get_aws_documentation_urls() -> List[str]:
     """
     Get list of important AWS documentation URLs
@@ -254,7 +421,7 @@ if __name__ == "__main__":
     chunks = setup.chunk_documents(documents)
     
     # Create vector store
-    vectorstore = setup.create_vector_store(chunks, use_chroma=True)
+    vectorstore = setup.create_vector_store(chunks, use_chroma=True, batch_size=256)
     
     print("RAG setup complete!")
 
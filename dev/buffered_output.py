@@ -0,0 +1,20 @@
+"""
+Output buffering shared by the CloudyIntel test scripts.
+"""
+
+import contextlib
+import functools
+import io
+import sys
+
+def buffered_output(test_fn):
+    """Collect a test's prints in memory and write them to stdout in one call."""
+    @functools.wraps(test_fn)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                return test_fn(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+    return wrapper
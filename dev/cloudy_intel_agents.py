@@ -1,30 +1,43 @@
+import copy
+import re
+import orjson
+from collections import OrderedDict
 from typing import Dict, Any, List
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.tools import Tool
-from langchain_community.utilities import GoogleSerperAPIWrapper
 from cloudy_intel_state import CloudyIntelState, Phase, mark_agent_complete
-from cloudy_intel_routing import determine_relevant_agents
+from cloudy_intel_routing import AGENT_TO_DOMAIN, determine_relevant_agents
+from tools import tool_web_search
 
 # Initialize LLM and tools
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
-serper = GoogleSerperAPIWrapper()
-
-# Tools
-tool_web_search = Tool(
-    name="web_search",
-    func=serper.run,
-    description="Useful for when you need more information from an online search"
-)
 
+# Tools (web_search results are cached per normalized query in tools.py)
 tools = [tool_web_search]
 llm_with_tools = llm.bind_tools(tools)
 
+# Feedback classifiers, compiled once; searching avoids lowercasing a copy of each response
+_ERROR_RE = re.compile(r"error", re.IGNORECASE)
+_SECURITY_FLAW_RE = re.compile(r"flaw|issue", re.IGNORECASE)
+_COST_FLAW_RE = re.compile(r"optimization|cost", re.IGNORECASE)
+_RELIABILITY_FLAW_RE = re.compile(r"issue|improvement", re.IGNORECASE)
+_PERFORMANCE_FLAW_RE = re.compile(r"optimization|improvement", re.IGNORECASE)
+_OPERATIONAL_FLAW_RE = re.compile(r"improvement|enhancement", re.IGNORECASE)
+
+def _dump_json(value: Any) -> str:
+    """Serialize state data for a prompt with orjson, which is much faster than json or repr."""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2, default=str).decode()
+
 # =============================================================================
 # PHASE 1: ARCHITECT TEAM
 # =============================================================================
 
-async def architect_supervisor(state: CloudyIntelState) -> CloudyIntelState:
+# First-pass supervisor plans, keyed by (problem_hash, cloud_provider, relevant agents).
+# Iteration 0 carries no feedback, so its plan depends only on the problem and provider.
+_SUPERVISOR_PLAN_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_SUPERVISOR_PLAN_CACHE_MAXSIZE = 256
+
+async def architect_supervisor(state: CloudyIntelState) -> Dict[str, Any]:
     """
     Dynamic supervisor that uses LLM to decompose user problems into specific tasks for domain architects.
     This avoids hardcoded task assignments and allows for more intelligent, context-aware decomposition.
@@ -32,6 +45,15 @@ async def architect_supervisor(state: CloudyIntelState) -> CloudyIntelState:
     # Determine which agents are actually needed based on the problem
     relevant_agents = determine_relevant_agents(state["user_problem"])
     
+    # A repeated problem's first pass reuses the earlier plan instead of calling the LLM
+    plan_key = None
+    if state["iteration_count"] == 0:
+        plan_key = (state["problem_hash"], state["cloud_provider"], tuple(relevant_agents))
+        cached_plan = _SUPERVISOR_PLAN_CACHE.get(plan_key)
+        if cached_plan is not None:
+            _SUPERVISOR_PLAN_CACHE.move_to_end(plan_key)
+            return copy.deepcopy(cached_plan)
+    
     # Create domain descriptions for the prompt
     domain_descriptions = {
         "compute_architect": "Compute Architect (EC2, Lambda, ECS, EKS, Auto Scaling, etc.)",
@@ -45,9 +67,9 @@ async def architect_supervisor(state: CloudyIntelState) -> CloudyIntelState:
     if state["iteration_count"] > 0:
         previous_context = f"""
         Previous iteration feedback:
-        - Validation Feedback: {state.get('validation_feedback', [])}
-        - Audit Feedback: {state.get('audit_feedback', [])}
-        - Current Architecture Components: {state.get('architecture_components', {})}
+        - Validation Feedback: {_dump_json(state.get('validation_feedback') or [])}
+        - Audit Feedback: {_dump_json(state.get('audit_feedback') or [])}
+        - Current Architecture Components: {_dump_json(state.get('architecture_components') or {})}
         """
     
     system_prompt = f"""
@@ -88,13 +110,11 @@ async def architect_supervisor(state: CloudyIntelState) -> CloudyIntelState:
     
     # Create specific task assignments for each relevant agent based on LLM analysis
     for agent in relevant_agents:
-        domain = agent.replace("_architect", "")
+        domain = AGENT_TO_DOMAIN[agent]
         
         # Create a more specific task based on the supervisor's analysis
+        # The analysis itself reaches the architects through their shared prompt prefix
         task_description = f"""
-        ARCHITECT SUPERVISOR ANALYSIS:
-        {response.content}
-        
         YOUR SPECIFIC TASK as {domain_descriptions[agent]}:
         Based on the user problem: "{state['user_problem']}"
         
@@ -123,46 +143,73 @@ async def architect_supervisor(state: CloudyIntelState) -> CloudyIntelState:
         
         task_assignments[domain] = task_description
     
-    new_state = state.copy()
-    new_state["messages"].append(response)
-    new_state["decomposed_tasks"] = decomposed_tasks
-    new_state["task_assignments"] = task_assignments
-    new_state["supervisor_analysis"] = response.content
-    new_state["active_agents"] = relevant_agents
-    new_state["completed_agents"] = []
+    plan = {
+        "messages": [response],
+        "decomposed_tasks": decomposed_tasks,
+        "task_assignments": task_assignments,
+        "supervisor_analysis": response.content,
+        "active_agents": relevant_agents,
+        "completed_agents": None  # Reset for the new phase
+    }
+    
+    if state["iteration_count"] > 0:
+        # The feedback has been folded into this plan; clear it for the next pass
+        plan["validation_feedback"] = None
+        plan["audit_feedback"] = None
     
-    return new_state
+    if plan_key is not None:
+        _SUPERVISOR_PLAN_CACHE[plan_key] = copy.deepcopy(plan)
+        if len(_SUPERVISOR_PLAN_CACHE) > _SUPERVISOR_PLAN_CACHE_MAXSIZE:
+            _SUPERVISOR_PLAN_CACHE.popitem(last=False)
+    
+    return plan
 
-async def architect_coordinator(state: CloudyIntelState) -> CloudyIntelState:
+async def architect_coordinator(state: CloudyIntelState) -> Dict[str, Any]:
     """Coordinates the completion of all architect agents."""
     # This is a simple pass-through coordinator
     # All architect agents have already completed and updated the state
     # We just need to ensure the state is properly coordinated
     
-    new_state = state.copy()
-    new_state["messages"].append({
-        "role": "system",
-        "content": "All architect agents have completed their tasks. Moving to validation phase."
-    })
+    return {
+        "messages": [{
+            "role": "system",
+            "content": "All architect agents have completed their tasks. Moving to validation phase."
+        }]
+    }
+
+def _architect_messages(state: CloudyIntelState, instructions: str) -> List:
+    """
+    Build a domain architect's prompt: a prefix shared by every architect, then its own instructions.
+    OpenAI caches repeated prompt prefixes automatically, so the problem and supervisor analysis
+    are prefilled once per iteration; nothing agent-specific may come before them.
+    """
+    shared_prompt = f"""
+    You are a {state['cloud_provider'].upper()} Domain Architect on the CloudyIntel architect team.
+    
+    Original user problem: {state['user_problem']}
+    """
+    if state.get("supervisor_analysis"):
+        shared_prompt += f"""
+    ARCHITECT SUPERVISOR ANALYSIS:
+    {state['supervisor_analysis']}
+    """
     
-    return new_state
+    return [SystemMessage(content=shared_prompt), HumanMessage(content=instructions)]
 
-async def compute_architect(state: CloudyIntelState) -> CloudyIntelState:
+async def compute_architect(state: CloudyIntelState) -> Dict[str, Any]:
     """AWS/Azure compute domain architect."""
     # Get the specific task assigned by the supervisor
-    compute_task = state.get("task_assignments", {}).get("compute", "")
-    decomposed_task = state.get("decomposed_tasks", {}).get("compute", {})
+    compute_task = state["task_assignments"].get("compute", "")
+    decomposed_task = state["decomposed_tasks"].get("compute", {})
     
     # Use the decomposed task if available, otherwise fall back to user problem
     task_context = compute_task if compute_task else f"Design compute resources for: {state['user_problem']}"
     
-    system_prompt = f"""
-    You are a {state['cloud_provider'].upper()} Compute Domain Architect.
+    instructions = f"""
+    You are the {state['cloud_provider'].upper()} Compute Domain Architect.
     
     Your assigned task: {task_context}
     
-    Original user problem: {state['user_problem']}
-    
     Consider:
     - EC2 instances (types, sizing, placement)
     - Lambda functions (serverless compute)
@@ -174,34 +221,33 @@ async def compute_architect(state: CloudyIntelState) -> CloudyIntelState:
     Provide detailed configuration recommendations.
     """
     
-    messages = [SystemMessage(content=system_prompt)]
-    response = await llm_with_tools.ainvoke(messages)
-    
-    new_state = mark_agent_complete(state, "compute_architect")
-    new_state["messages"].append(response)
-    new_state["architecture_components"]["compute"] = {
-        "recommendations": response.content,
-        "agent": "compute_architect",
-        "task_assigned": task_context
+    response = await llm_with_tools.ainvoke(_architect_messages(state, instructions))
+    
+    update = mark_agent_complete(state, "compute_architect")
+    update["messages"] = [response]
+    update["architecture_components"] = {
+        "compute": {
+            "recommendations": response.content,
+            "agent": "compute_architect",
+            "task_assigned": task_context
+        }
     }
     
-    return new_state
+    return update
 
-async def network_architect(state: CloudyIntelState) -> CloudyIntelState:
+async def network_architect(state: CloudyIntelState) -> Dict[str, Any]:
     """AWS/Azure network domain architect."""
     # Get the specific task assigned by the supervisor
-    network_task = state.get("task_assignments", {}).get("network", "")
+    network_task = state["task_assignments"].get("network", "")
     
     # Use the decomposed task if available, otherwise fall back to user problem
     task_context = network_task if network_task else f"Design network infrastructure for: {state['user_problem']}"
     
-    system_prompt = f"""
-    You are a {state['cloud_provider'].upper()} Network Domain Architect.
+    instructions = f"""
+    You are the {state['cloud_provider'].upper()} Network Domain Architect.
     
     Your assigned task: {task_context}
     
-    Original user problem: {state['user_problem']}
-    
     Consider:
     - VPC design and subnets
     - Security Groups and NACLs
@@ -214,34 +260,33 @@ async def network_architect(state: CloudyIntelState) -> CloudyIntelState:
     Provide detailed network architecture.
     """
     
-    messages = [SystemMessage(content=system_prompt)]
-    response = await llm_with_tools.ainvoke(messages)
-    
-    new_state = mark_agent_complete(state, "network_architect")
-    new_state["messages"].append(response)
-    new_state["architecture_components"]["network"] = {
-        "recommendations": response.content,
-        "agent": "network_architect",
-        "task_assigned": task_context
+    response = await llm_with_tools.ainvoke(_architect_messages(state, instructions))
+    
+    update = mark_agent_complete(state, "network_architect")
+    update["messages"] = [response]
+    update["architecture_components"] = {
+        "network": {
+            "recommendations": response.content,
+            "agent": "network_architect",
+            "task_assigned": task_context
+        }
     }
     
-    return new_state
+    return update
 
-async def storage_architect(state: CloudyIntelState) -> CloudyIntelState:
+async def storage_architect(state: CloudyIntelState) -> Dict[str, Any]:
     """AWS/Azure storage domain architect."""
     # Get the specific task assigned by the supervisor
-    storage_task = state.get("task_assignments", {}).get("storage", "")
+    storage_task = state["task_assignments"].get("storage", "")
     
     # Use the decomposed task if available, otherwise fall back to user problem
     task_context = storage_task if storage_task else f"Design storage solutions for: {state['user_problem']}"
     
-    system_prompt = f"""
-    You are a {state['cloud_provider'].upper()} Storage Domain Architect.
+    instructions = f"""
+    You are the {state['cloud_provider'].upper()} Storage Domain Architect.
     
     Your assigned task: {task_context}
     
-    Original user problem: {state['user_problem']}
-    
     Consider:
     - S3 buckets (object storage)
     - EBS volumes (block storage)
@@ -253,34 +298,33 @@ async def storage_architect(state: CloudyIntelState) -> CloudyIntelState:
     Provide detailed storage architecture.
     """
     
-    messages = [SystemMessage(content=system_prompt)]
-    response = await llm_with_tools.ainvoke(messages)
-    
-    new_state = mark_agent_complete(state, "storage_architect")
-    new_state["messages"].append(response)
-    new_state["architecture_components"]["storage"] = {
-        "recommendations": response.content,
-        "agent": "storage_architect",
-        "task_assigned": task_context
+    response = await llm_with_tools.ainvoke(_architect_messages(state, instructions))
+    
+    update = mark_agent_complete(state, "storage_architect")
+    update["messages"] = [response]
+    update["architecture_components"] = {
+        "storage": {
+            "recommendations": response.content,
+            "agent": "storage_architect",
+            "task_assigned": task_context
+        }
     }
     
-    return new_state
+    return update
 
-async def database_architect(state: CloudyIntelState) -> CloudyIntelState:
+async def database_architect(state: CloudyIntelState) -> Dict[str, Any]:
     """AWS/Azure database domain architect."""
     # Get the specific task assigned by the supervisor
-    database_task = state.get("task_assignments", {}).get("database", "")
+    database_task = state["task_assignments"].get("database", "")
     
     # Use the decomposed task if available, otherwise fall back to user problem
     task_context = database_task if database_task else f"Design database solutions for: {state['user_problem']}"
     
-    system_prompt = f"""
-    You are a {state['cloud_provider'].upper()} Database Domain Architect.
+    instructions = f"""
+    You are the {state['cloud_provider'].upper()} Database Domain Architect.
     
     Your assigned task: {task_context}
     
-    Original user problem: {state['user_problem']}
-    
     Consider:
     - RDS (managed relational databases)
     - DynamoDB (NoSQL)
@@ -292,24 +336,25 @@ async def database_architect(state: CloudyIntelState) -> CloudyIntelState:
     Provide detailed database architecture.
     """
     
-    messages = [SystemMessage(content=system_prompt)]
-    response = await llm_with_tools.ainvoke(messages)
-    
-    new_state = mark_agent_complete(state, "database_architect")
-    new_state["messages"].append(response)
-    new_state["architecture_components"]["database"] = {
-        "recommendations": response.content,
-        "agent": "database_architect",
-        "task_assigned": task_context
+    response = await llm_with_tools.ainvoke(_architect_messages(state, instructions))
+    
+    update = mark_agent_complete(state, "database_architect")
+    update["messages"] = [response]
+    update["architecture_components"] = {
+        "database": {
+            "recommendations": response.content,
+            "agent": "database_architect",
+            "task_assigned": task_context
+        }
     }
     
-    return new_state
+    return update
 
 # =============================================================================
 # PHASE 2: VALIDATOR TEAM
 # =============================================================================
 
-async def validator_supervisor(state: CloudyIntelState) -> CloudyIntelState:
+async def validator_supervisor(state: CloudyIntelState) -> Dict[str, Any]:
     """Supervisor that coordinates relevant validator agents based on the problem."""
     # Determine which validators are needed based on the original problem
     relevant_architects = determine_relevant_agents(state["user_problem"])
@@ -343,15 +388,14 @@ async def validator_supervisor(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = state.copy()
-    new_state["messages"].append(response)
-    new_state["active_agents"] = relevant_validators
-    new_state["completed_agents"] = []
-    new_state["current_phase"] = Phase.VALIDATE
-    
-    return new_state
+    return {
+        "messages": [response],
+        "active_agents": relevant_validators,
+        "completed_agents": None,  # Reset for the new phase
+        "current_phase": Phase.VALIDATE
+    }
 
-async def compute_validator(state: CloudyIntelState) -> CloudyIntelState:
+async def compute_validator(state: CloudyIntelState) -> Dict[str, Any]:
     """Validate compute architecture for technical correctness."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Compute Validator.
@@ -372,24 +416,22 @@ async def compute_validator(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "compute_validator")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "compute_validator")
+    update["messages"] = [response]
     
     # Extract validation feedback
     validation_feedback = {
         "domain": "compute",
         "agent": "compute_validator",
         "feedback": response.content,
-        "has_errors": "error" in response.content.lower()
+        "has_errors": bool(_ERROR_RE.search(response.content))
     }
     
-    if "validation_feedback" not in new_state:
-        new_state["validation_feedback"] = []
-    new_state["validation_feedback"].append(validation_feedback)
+    update["validation_feedback"] = [validation_feedback]
     
-    return new_state
+    return update
 
-async def network_validator(state: CloudyIntelState) -> CloudyIntelState:
+async def network_validator(state: CloudyIntelState) -> Dict[str, Any]:
     """Validate network architecture for technical correctness."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Network Validator.
@@ -410,23 +452,21 @@ async def network_validator(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "network_validator")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "network_validator")
+    update["messages"] = [response]
     
     validation_feedback = {
         "domain": "network",
         "agent": "network_validator",
         "feedback": response.content,
-        "has_errors": "error" in response.content.lower()
+        "has_errors": bool(_ERROR_RE.search(response.content))
     }
     
-    if "validation_feedback" not in new_state:
-        new_state["validation_feedback"] = []
-    new_state["validation_feedback"].append(validation_feedback)
+    update["validation_feedback"] = [validation_feedback]
     
-    return new_state
+    return update
 
-async def storage_validator(state: CloudyIntelState) -> CloudyIntelState:
+async def storage_validator(state: CloudyIntelState) -> Dict[str, Any]:
     """Validate storage architecture for technical correctness."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Storage Validator.
@@ -447,23 +487,21 @@ async def storage_validator(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "storage_validator")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "storage_validator")
+    update["messages"] = [response]
     
     validation_feedback = {
         "domain": "storage",
         "agent": "storage_validator",
         "feedback": response.content,
-        "has_errors": "error" in response.content.lower()
+        "has_errors": bool(_ERROR_RE.search(response.content))
     }
     
-    if "validation_feedback" not in new_state:
-        new_state["validation_feedback"] = []
-    new_state["validation_feedback"].append(validation_feedback)
+    update["validation_feedback"] = [validation_feedback]
     
-    return new_state
+    return update
 
-async def database_validator(state: CloudyIntelState) -> CloudyIntelState:
+async def database_validator(state: CloudyIntelState) -> Dict[str, Any]:
     """Validate database architecture for technical correctness."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Database Validator.
@@ -484,27 +522,25 @@ async def database_validator(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "database_validator")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "database_validator")
+    update["messages"] = [response]
     
     validation_feedback = {
         "domain": "database",
         "agent": "database_validator",
         "feedback": response.content,
-        "has_errors": "error" in response.content.lower()
+        "has_errors": bool(_ERROR_RE.search(response.content))
     }
     
-    if "validation_feedback" not in new_state:
-        new_state["validation_feedback"] = []
-    new_state["validation_feedback"].append(validation_feedback)
+    update["validation_feedback"] = [validation_feedback]
     
-    return new_state
+    return update
 
 # =============================================================================
 # PHASE 3: PILLAR AUDITOR TEAM
 # =============================================================================
 
-async def pillar_audit_supervisor(state: CloudyIntelState) -> CloudyIntelState:
+async def pillar_audit_supervisor(state: CloudyIntelState) -> Dict[str, Any]:
     """Supervisor that coordinates all pillar auditors."""
     system_prompt = f"""
     You are the Pillar Audit Supervisor for {state['cloud_provider'].upper()} architecture auditing.
@@ -525,15 +561,14 @@ async def pillar_audit_supervisor(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = state.copy()
-    new_state["messages"].append(response)
-    new_state["active_agents"] = ["security_auditor", "cost_auditor", "reliability_auditor", "performance_auditor", "operational_excellence_auditor"]
-    new_state["completed_agents"] = []
-    new_state["current_phase"] = Phase.AUDIT
-    
-    return new_state
+    return {
+        "messages": [response],
+        "active_agents": ["security_auditor", "cost_auditor", "reliability_auditor", "performance_auditor", "operational_excellence_auditor"],
+        "completed_agents": None,  # Reset for the new phase
+        "current_phase": Phase.AUDIT
+    }
 
-async def security_auditor(state: CloudyIntelState) -> CloudyIntelState:
+async def security_auditor(state: CloudyIntelState) -> Dict[str, Any]:
     """Audit architecture for security best practices."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Security Auditor.
@@ -554,23 +589,21 @@ async def security_auditor(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "security_auditor")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "security_auditor")
+    update["messages"] = [response]
     
     audit_feedback = {
         "pillar": "security",
         "agent": "security_auditor",
         "feedback": response.content,
-        "has_flaws": "flaw" in response.content.lower() or "issue" in response.content.lower()
+        "has_flaws": bool(_SECURITY_FLAW_RE.search(response.content))
     }
     
-    if "audit_feedback" not in new_state:
-        new_state["audit_feedback"] = []
-    new_state["audit_feedback"].append(audit_feedback)
+    update["audit_feedback"] = [audit_feedback]
     
-    return new_state
+    return update
 
-async def cost_auditor(state: CloudyIntelState) -> CloudyIntelState:
+async def cost_auditor(state: CloudyIntelState) -> Dict[str, Any]:
     """Audit architecture for cost optimization."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Cost Auditor.
@@ -591,23 +624,21 @@ async def cost_auditor(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "cost_auditor")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "cost_auditor")
+    update["messages"] = [response]
     
     audit_feedback = {
         "pillar": "cost",
         "agent": "cost_auditor",
         "feedback": response.content,
-        "has_flaws": "optimization" in response.content.lower() or "cost" in response.content.lower()
+        "has_flaws": bool(_COST_FLAW_RE.search(response.content))
     }
     
-    if "audit_feedback" not in new_state:
-        new_state["audit_feedback"] = []
-    new_state["audit_feedback"].append(audit_feedback)
+    update["audit_feedback"] = [audit_feedback]
     
-    return new_state
+    return update
 
-async def reliability_auditor(state: CloudyIntelState) -> CloudyIntelState:
+async def reliability_auditor(state: CloudyIntelState) -> Dict[str, Any]:
     """Audit architecture for reliability and availability."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Reliability Auditor.
@@ -628,23 +659,21 @@ async def reliability_auditor(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "reliability_auditor")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "reliability_auditor")
+    update["messages"] = [response]
     
     audit_feedback = {
         "pillar": "reliability",
         "agent": "reliability_auditor",
         "feedback": response.content,
-        "has_flaws": "issue" in response.content.lower() or "improvement" in response.content.lower()
+        "has_flaws": bool(_RELIABILITY_FLAW_RE.search(response.content))
     }
     
-    if "audit_feedback" not in new_state:
-        new_state["audit_feedback"] = []
-    new_state["audit_feedback"].append(audit_feedback)
+    update["audit_feedback"] = [audit_feedback]
     
-    return new_state
+    return update
 
-async def performance_auditor(state: CloudyIntelState) -> CloudyIntelState:
+async def performance_auditor(state: CloudyIntelState) -> Dict[str, Any]:
     """Audit architecture for performance optimization."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Performance Auditor.
@@ -665,23 +694,21 @@ async def performance_auditor(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "performance_auditor")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "performance_auditor")
+    update["messages"] = [response]
     
     audit_feedback = {
         "pillar": "performance",
         "agent": "performance_auditor",
         "feedback": response.content,
-        "has_flaws": "optimization" in response.content.lower() or "improvement" in response.content.lower()
+        "has_flaws": bool(_PERFORMANCE_FLAW_RE.search(response.content))
     }
     
-    if "audit_feedback" not in new_state:
-        new_state["audit_feedback"] = []
-    new_state["audit_feedback"].append(audit_feedback)
+    update["audit_feedback"] = [audit_feedback]
     
-    return new_state
+    return update
 
-async def operational_excellence_auditor(state: CloudyIntelState) -> CloudyIntelState:
+async def operational_excellence_auditor(state: CloudyIntelState) -> Dict[str, Any]:
     """Audit architecture for operational excellence."""
     system_prompt = f"""
     You are a {state['cloud_provider'].upper()} Operational Excellence Auditor.
@@ -702,27 +729,25 @@ async def operational_excellence_auditor(state: CloudyIntelState) -> CloudyIntel
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = mark_agent_complete(state, "operational_excellence_auditor")
-    new_state["messages"].append(response)
+    update = mark_agent_complete(state, "operational_excellence_auditor")
+    update["messages"] = [response]
     
     audit_feedback = {
         "pillar": "operational_excellence",
         "agent": "operational_excellence_auditor",
         "feedback": response.content,
-        "has_flaws": "improvement" in response.content.lower() or "enhancement" in response.content.lower()
+        "has_flaws": bool(_OPERATIONAL_FLAW_RE.search(response.content))
     }
     
-    if "audit_feedback" not in new_state:
-        new_state["audit_feedback"] = []
-    new_state["audit_feedback"].append(audit_feedback)
+    update["audit_feedback"] = [audit_feedback]
     
-    return new_state
+    return update
 
 # =============================================================================
 # FINAL PRESENTER
 # =============================================================================
 
-async def final_presenter(state: CloudyIntelState) -> CloudyIntelState:
+async def final_presenter(state: CloudyIntelState) -> Dict[str, Any]:
     """Present the final approved architecture."""
     system_prompt = f"""
     You are the Final Presenter for CloudyIntel.
@@ -746,10 +771,9 @@ async def final_presenter(state: CloudyIntelState) -> CloudyIntelState:
     messages = [SystemMessage(content=system_prompt)]
     response = await llm.ainvoke(messages)
     
-    new_state = state.copy()
-    new_state["messages"].append(response)
-    new_state["current_phase"] = Phase.COMPLETE
-    new_state["final_architecture"] = state["architecture_components"]
-    new_state["architecture_summary"] = response.content
-    
-    return new_state
+    return {
+        "messages": [response],
+        "current_phase": Phase.COMPLETE,
+        "final_architecture": state["architecture_components"],
+        "architecture_summary": response.content
+    }
@@ -0,0 +1,32 @@
+"""
+Guarded imports of the CloudyIntel modules for the demo and test scripts.
+
+Each module is imported once, separately, so scripts that don't need API keys
+still run without them (cloudy_intel_agents fails at import without an OpenAI key).
+"""
+
+import importlib
+from typing import Dict
+
+CLOUDY_INTEL_MODULES = (
+    "cloudy_intel_state",
+    "cloudy_intel_agents",
+    "cloudy_intel_routing",
+    "cloudy_intel_rag",
+    "cloudy_intel_main",
+)
+
+# Module name -> the exception raised while importing it
+IMPORT_ERRORS: Dict[str, Exception] = {}
+
+for _module in CLOUDY_INTEL_MODULES:
+    try:
+        importlib.import_module(_module)
+    except Exception as e:
+        IMPORT_ERRORS[_module] = e
+
+def require(*modules: str):
+    """Raise the original import error of the first unavailable module."""
+    for module in modules:
+        if module in IMPORT_ERRORS:
+            raise IMPORT_ERRORS[module]
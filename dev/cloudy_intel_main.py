@@ -29,10 +29,12 @@ from cloudy_intel_agents import (
 )
 from cloudy_intel_routing import (
     phase_router, inner_loop_router, outer_loop_router, agent_completion_router,
-    evaluate_validation_feedback, evaluate_audit_feedback, force_completion
+    evaluate_validation_feedback, evaluate_audit_feedback, should_continue_looping, force_completion,
+    prepare_validation_evaluation, prepare_audit_evaluation, prepare_validation_retry, prepare_audit_retry
 )
 from cloudy_intel_rag import (
-    create_enhanced_architect_agent, create_enhanced_validator_agent, create_enhanced_auditor_agent
+    create_enhanced_architect_agent, create_enhanced_validator_agent, create_enhanced_auditor_agent,
+    precompute_rag_contexts
 )
 
 class CloudyIntel:
@@ -107,15 +109,30 @@ class CloudyIntel:
             graph_builder.add_node("performance_auditor", performance_auditor)
             graph_builder.add_node("operational_excellence_auditor", operational_excellence_auditor)
         
+        # Feedback evaluation and iteration reset
+        graph_builder.add_node("evaluate_validation_feedback", prepare_validation_evaluation)
+        graph_builder.add_node("evaluate_audit_feedback", prepare_audit_evaluation)
+        graph_builder.add_node("prepare_validation_retry", prepare_validation_retry)
+        graph_builder.add_node("prepare_audit_retry", prepare_audit_retry)
+        graph_builder.add_node("force_completion", force_completion)
+        
         # Final Presenter
         graph_builder.add_node("final_presenter", final_presenter)
         
+        if self.use_rag:
+            # Run all RAG lookups once, up front, for the enhanced agents
+            graph_builder.add_node("precompute_rag_contexts", precompute_rag_contexts)
+        
         # =============================================================================
         # ADD EDGES
         # =============================================================================
         
-        # Start with architect supervisor
-        graph_builder.add_edge(START, "architect_supervisor")
+        # Start with architect supervisor (after precomputing RAG contexts when enabled)
+        if self.use_rag:
+            graph_builder.add_edge(START, "precompute_rag_contexts")
+            graph_builder.add_edge("precompute_rag_contexts", "architect_supervisor")
+        else:
+            graph_builder.add_edge(START, "architect_supervisor")
         
         # Phase 1: Architect team coordination - all architects run in parallel
         # No conditional routing needed here as all architects start from supervisor
@@ -162,10 +179,19 @@ class CloudyIntel:
             "evaluate_validation_feedback",
             evaluate_validation_feedback,
             {
-                "return_to_architects": "architect_supervisor",
+                "return_to_architects": "prepare_validation_retry",
                 "move_to_audit": "pillar_audit_supervisor"
             }
         )
+        graph_builder.add_conditional_edges(
+            "prepare_validation_retry",
+            should_continue_looping,
+            {
+                "continue_looping": "architect_supervisor",
+                "force_completion": "force_completion",
+                "complete": "final_presenter"
+            }
+        )
         
         # Phase 3: Pillar auditor team coordination
         graph_builder.add_conditional_edges(
@@ -196,11 +222,23 @@ class CloudyIntel:
             "evaluate_audit_feedback",
             evaluate_audit_feedback,
             {
-                "return_to_architects": "architect_supervisor",
+                "return_to_architects": "prepare_audit_retry",
+                "complete": "final_presenter"
+            }
+        )
+        graph_builder.add_conditional_edges(
+            "prepare_audit_retry",
+            should_continue_looping,
+            {
+                "continue_looping": "architect_supervisor",
+                "force_completion": "force_completion",
                 "complete": "final_presenter"
             }
         )
         
+        # Iteration limit reached: present the current architecture
+        graph_builder.add_edge("force_completion", "final_presenter")
+        
         # Final presenter
         graph_builder.add_edge("final_presenter", END)
         
@@ -208,6 +246,7 @@ class CloudyIntel:
         # COMPILE GRAPH
         # =============================================================================
         
+        # Checkpoints are encoded with ormsgpack by langgraph-checkpoint>=2.0, not stdlib json
         memory = MemorySaver()
         self.graph = graph_builder.compile(checkpointer=memory)
     
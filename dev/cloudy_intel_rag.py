@@ -1,11 +1,19 @@
 from typing import List, Dict, Any
+from collections import OrderedDict
+from functools import lru_cache
+from langchain_core.embeddings import Embeddings
 from langchain_core.tools import Tool
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OpenAIEmbeddings
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import ChatOpenAI
+import faiss
+import hashlib
+import numpy as np
 import os
+import re
+import threading
 
 # Import CloudyIntelState for type hints
 try:
@@ -14,42 +22,139 @@ except ImportError:
     # Fallback for when running independently
     CloudyIntelState = Dict[str, Any]
 
+from cloudy_intel_agents import _ERROR_RE
+
+# Flaw classifier for RAG validator feedback, compiled once
+_FLAW_RE = re.compile(r"flaw|issue", re.IGNORECASE)
+
+# Shared RAG instance per cloud provider (the first one built for each provider)
+_rag_instances: Dict[str, "CloudyIntelRAG"] = {}
+
+# Cloud documentation URLs
+_DOC_URLS = {
+    "aws": [
+        "https://docs.aws.amazon.com/wellarchitected/latest/framework/",
+        "https://docs.aws.amazon.com/architecture/",
+        "https://aws.amazon.com/architecture/well-architected/",
+        "https://docs.aws.amazon.com/whitepapers/",
+        "https://aws.amazon.com/security/security-resources/",
+        "https://aws.amazon.com/compliance/",
+        "https://docs.aws.amazon.com/cost-management/",
+        "https://aws.amazon.com/reliability/"
+    ],
+    "azure": [
+        "https://docs.microsoft.com/en-us/azure/architecture/",
+        "https://docs.microsoft.com/en-us/azure/well-architected/",
+        "https://docs.microsoft.com/en-us/azure/security/",
+        "https://docs.microsoft.com/en-us/azure/cost-management/",
+        "https://docs.microsoft.com/en-us/azure/reliability/",
+        "https://docs.microsoft.com/en-us/azure/performance/",
+        "https://docs.microsoft.com/en-us/azure/operational-excellence/"
+    ]
+}
+
+class CachedEmbeddings(Embeddings):
+    """Query embeddings cached in a bounded in-memory LRU backed by .npy files on disk.
+    
+    Queries such as the user problem and "security audit" repeat across
+    iterations and runs, so after the first run they skip the embedding API.
+    Document embeddings pass straight through; the corpus is embedded once per setup.
+    """
+    
+    def __init__(self, inner: Embeddings, cache_dir: str = ".emb_cache", maxsize: int = 4096):
+        self.inner = inner
+        self.cache_dir = cache_dir
+        self.maxsize = maxsize
+        self._mem: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Vectors from different models are not interchangeable
+        self._model = str(getattr(inner, "model", type(inner).__name__))
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._model}\0{text}".encode("utf-8")).hexdigest()
+    
+    def _lookup(self, key: str):
+        with self._lock:
+            vector = self._mem.get(key)
+            if vector is not None:
+                self._mem.move_to_end(key)
+                return vector
+        path = os.path.join(self.cache_dir, f"{key}.npy")
+        if os.path.exists(path):
+            vector = np.load(path).tolist()
+            self._remember(key, vector)
+        return vector
+    
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._mem[key] = vector
+            self._mem.move_to_end(key)
+            if len(self._mem) > self.maxsize:
+                self._mem.popitem(last=False)
+    
+    def _store(self, key: str, vector: List[float]):
+        # Write then rename so a concurrent reader never loads a partial file
+        path = os.path.join(self.cache_dir, f"{key}.npy")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(vector, dtype="float32"))
+        os.replace(tmp_path, path)
+        self._remember(key, vector)
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, sending only the cache misses to the inner model in one call."""
+        keys = [self._key(text) for text in texts]
+        vectors = [self._lookup(key) for key in keys]
+        
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            # Same text always yields the same key, so one request per distinct miss
+            miss_texts = list(dict.fromkeys(texts[i] for i in misses))
+            fresh = dict(zip(miss_texts, self.inner.embed_documents(miss_texts)))
+            for i in misses:
+                vectors[i] = fresh[texts[i]]
+            for text, vector in fresh.items():
+                self._store(self._key(text), vector)
+        
+        return vectors
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
 class CloudyIntelRAG:
-    """RAG system for cloud documentation and best practices."""
+    """RAG system for cloud documentation and best practices.
+    
+    The documentation crawl and embedding run lazily on the first search, so
+    agents that routing never selects do not pay for them.
+    """
     
     def __init__(self, cloud_provider: str = "aws"):
+        if cloud_provider.lower() not in _DOC_URLS:
+            raise ValueError(f"Unsupported cloud provider: {cloud_provider}")
         self.cloud_provider = cloud_provider
-        self.embeddings = OpenAIEmbeddings()
+        self.embeddings = CachedEmbeddings(OpenAIEmbeddings())
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
         self.vectorstore = None
-        self._setup_rag()
+        self._setup_lock = threading.Lock()
+        # Per-instance memo: queries repeat across GENERATE/VALIDATE/AUDIT iterations
+        self._cached_rag_context = lru_cache(maxsize=1024)(self._build_rag_context)
+        _rag_instances.setdefault(cloud_provider, self)
+    
+    def _ensure_setup(self):
+        """Build the vector store on first use; safe to call from concurrent agents."""
+        if self.vectorstore is not None:
+            return
+        with self._setup_lock:
+            if self.vectorstore is None:
+                self._setup_rag()
     
     def _setup_rag(self):
         """Setup RAG with cloud documentation."""
-        # Cloud documentation URLs
-        if self.cloud_provider.lower() == "aws":
-            urls = [
-                "https://docs.aws.amazon.com/wellarchitected/latest/framework/",
-                "https://docs.aws.amazon.com/architecture/",
-                "https://aws.amazon.com/architecture/well-architected/",
-                "https://docs.aws.amazon.com/whitepapers/",
-                "https://aws.amazon.com/security/security-resources/",
-                "https://aws.amazon.com/compliance/",
-                "https://docs.aws.amazon.com/cost-management/",
-                "https://aws.amazon.com/reliability/"
-            ]
-        elif self.cloud_provider.lower() == "azure":
-            urls = [
-                "https://docs.microsoft.com/en-us/azure/architecture/",
-                "https://docs.microsoft.com/en-us/azure/well-architected/",
-                "https://docs.microsoft.com/en-us/azure/security/",
-                "https://docs.microsoft.com/en-us/azure/cost-management/",
-                "https://docs.microsoft.com/en-us/azure/reliability/",
-                "https://docs.microsoft.com/en-us/azure/performance/",
-                "https://docs.microsoft.com/en-us/azure/operational-excellence/"
-            ]
-        else:
-            raise ValueError(f"Unsupported cloud provider: {self.cloud_provider}")
+        urls = _DOC_URLS[self.cloud_provider.lower()]
         
         # Load documents
         loader = WebBaseLoader(urls)
@@ -62,40 +167,76 @@ class CloudyIntelRAG:
         )
         splits = text_splitter.split_documents(documents)
         
-        # Create vector store
-        self.vectorstore = FAISS.from_documents(splits, self.embeddings)
+        # Create vector store, then replace the exhaustive flat FP32 index with a quantized ANN index
+        vectorstore = FAISS.from_documents(splits, self.embeddings)
+        vectorstore.index = self._build_search_index(vectorstore.index)
+        # Publish only once fully built, since _ensure_setup checks it without the lock
+        self.vectorstore = vectorstore
+    
+    @staticmethod
+    def _build_search_index(flat_index: faiss.Index) -> faiss.Index:
+        """Rebuild a flat L2 index as a quantized approximate index.
+        
+        HNSW over 8-bit scalar-quantized vectors cuts memory ~4x versus FP32;
+        very large corpora use IVF with product quantization instead.
+        """
+        dim = flat_index.d
+        # Vectors are re-added in their original order so index_to_docstore_id stays valid
+        vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+        
+        if flat_index.ntotal > 100_000 and dim % 64 == 0:
+            index = faiss.index_factory(dim, "IVF256,PQ64")
+            index.train(vectors)
+            faiss.extract_index_ivf(index).nprobe = 16
+        else:
+            index = faiss.index_factory(dim, "HNSW32,SQ8")
+            index.train(vectors)
+            hnsw = faiss.downcast_index(index).hnsw
+            hnsw.efConstruction = 64
+            hnsw.efSearch = 32
+        
+        index.add(vectors)
+        return index
     
     def search_documentation(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Search cloud documentation for relevant information."""
-        if not self.vectorstore:
-            return []
+        self._ensure_setup()
         
         # Search for relevant documents
         docs = self.vectorstore.similarity_search(query, k=k)
         
-        # Format results
-        results = []
-        for doc in docs:
-            results.append({
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "source": doc.metadata.get("source", "Unknown")
-            })
-        
-        return results
+        return [_format_result(doc) for doc in docs]
+    
+    def batch_search(self, queries: List[str], k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Search documentation for several queries with one embedding call and one FAISS search."""
+        if not queries:
+            return []
+        self._ensure_setup()
+        
+        # Embed and search each distinct query once
+        unique_queries = list(dict.fromkeys(queries))
+        xq = np.asarray(self.embeddings.embed_queries(unique_queries), dtype="float32")
+        _, indices = self.vectorstore.index.search(xq, k)
+        
+        results_by_query = {}
+        for query, row in zip(unique_queries, indices):
+            results = []
+            for i in row:
+                if i == -1:  # Fewer than k vectors in the index
+                    continue
+                doc = self.vectorstore.docstore.search(self.vectorstore.index_to_docstore_id[i])
+                results.append(_format_result(doc))
+            results_by_query[query] = results
+        
+        return [results_by_query[query] for query in queries]
     
     def get_rag_context(self, query: str, k: int = 5) -> str:
-        """Get RAG context for a query."""
-        results = self.search_documentation(query, k)
-        
-        if not results:
-            return "No relevant documentation found."
-        
-        context = "Relevant documentation:\n\n"
-        for i, result in enumerate(results, 1):
-            context += f"{i}. {result['content']}\n\n"
-        
-        return context
+        """Get RAG context for a query, memoized per (query, k) on this instance."""
+        return self._cached_rag_context(query, k)
+    
+    def _build_rag_context(self, query: str, k: int) -> str:
+        """Search the documentation and format the results as context."""
+        return _format_rag_context(self.search_documentation(query, k))
     
     def create_rag_tool(self, tool_name: str, description: str) -> Tool:
         """Create a RAG tool for agents."""
@@ -108,10 +249,36 @@ class CloudyIntelRAG:
             description=description
         )
 
+def _format_result(doc) -> Dict[str, Any]:
+    """Convert a retrieved document into a search result."""
+    return {
+        "content": doc.page_content,
+        "metadata": doc.metadata,
+        "source": doc.metadata.get("source", "Unknown")
+    }
+
+def _format_rag_context(results: List[Dict[str, Any]]) -> str:
+    """Format search results as context for an agent prompt."""
+    if not results:
+        return "No relevant documentation found."
+    
+    parts: List[str] = ["Relevant documentation:\n\n"]
+    for i, result in enumerate(results, 1):
+        parts.append(f"{i}. {result['content']}\n\n")
+    
+    return "".join(parts)
+
+def _get_rag(cloud_provider: str) -> CloudyIntelRAG:
+    """Return the shared RAG instance for a cloud provider, building it on first use."""
+    rag = _rag_instances.get(cloud_provider)
+    if rag is None:
+        rag = CloudyIntelRAG(cloud_provider)
+    return rag
+
 # RAG tools for different agent types
 def create_architect_rag_tools(cloud_provider: str = "aws") -> List[Tool]:
     """Create RAG tools for architect agents."""
-    rag = CloudyIntelRAG(cloud_provider)
+    rag = _get_rag(cloud_provider)
     
     tools = [
         rag.create_rag_tool(
@@ -132,7 +299,7 @@ def create_architect_rag_tools(cloud_provider: str = "aws") -> List[Tool]:
 
 def create_validator_rag_tools(cloud_provider: str = "aws") -> List[Tool]:
     """Create RAG tools for validator agents."""
-    rag = CloudyIntelRAG(cloud_provider)
+    rag = _get_rag(cloud_provider)
     
     tools = [
         rag.create_rag_tool(
@@ -153,7 +320,7 @@ def create_validator_rag_tools(cloud_provider: str = "aws") -> List[Tool]:
 
 def create_auditor_rag_tools(cloud_provider: str = "aws") -> List[Tool]:
     """Create RAG tools for auditor agents."""
-    rag = CloudyIntelRAG(cloud_provider)
+    rag = _get_rag(cloud_provider)
     
     tools = [
         rag.create_rag_tool(
@@ -180,12 +347,57 @@ def create_auditor_rag_tools(cloud_provider: str = "aws") -> List[Tool]:
     
     return tools
 
+# rag_cache key recording that precomputation failed (value: the error); agents then skip RAG
+_RAG_UNAVAILABLE = "__rag_unavailable__"
+
+def _gather_rag_context(rag: CloudyIntelRAG, rag_tools: List[Tool], query: str, rag_cache: Dict[str, str]) -> str:
+    """Collect context for every RAG tool, preferring contexts precomputed for this run.
+    
+    Returns an empty context when RAG is unavailable, so search errors never reach the LLM.
+    """
+    if _RAG_UNAVAILABLE in rag_cache:
+        return ""
+    
+    context = rag_cache.get(query)
+    if context is None:
+        # Otherwise search once through the instance memo; every tool asks the same
+        # query, and later iterations repeat it
+        try:
+            context = rag.get_rag_context(query)
+        except Exception:
+            return ""
+    
+    return "".join(f"\n{tool.name}: {context}\n" for tool in rag_tools)
+
+# Domains and pillars the enhanced validators and auditors query for
+_RAG_DOMAINS = ("compute", "network", "storage", "database")
+_RAG_PILLARS = ("security", "cost", "reliability", "performance", "operational_excellence")
+
+def precompute_rag_contexts(state: CloudyIntelState) -> Dict[str, Any]:
+    """Run every RAG query the enhanced agents will make in one batched search.
+    
+    Architects query the user problem, validators f"{domain} validation" and
+    auditors f"{pillar} audit"; none of these change between iterations.
+    """
+    queries = [state["user_problem"]]
+    queries += [f"{domain} validation" for domain in _RAG_DOMAINS]
+    queries += [f"{pillar} audit" for pillar in _RAG_PILLARS]
+    
+    try:
+        groups = _get_rag(state["cloud_provider"]).batch_search(queries)
+    except Exception as e:
+        # Setup or search failed (network, embeddings); record it so the agents
+        # skip RAG instead of each retrying the same failing search
+        return {"rag_cache": {_RAG_UNAVAILABLE: str(e)}}
+    return {"rag_cache": {query: _format_rag_context(results) for query, results in zip(queries, groups)}}
+
 # Enhanced agent functions with RAG tools
 def create_enhanced_architect_agent(agent_name: str, domain: str, cloud_provider: str = "aws"):
     """Create an enhanced architect agent with RAG tools."""
+    rag = _get_rag(cloud_provider)
     rag_tools = create_architect_rag_tools(cloud_provider)
     
-    def enhanced_architect(state: CloudyIntelState) -> CloudyIntelState:
+    def enhanced_architect(state: CloudyIntelState) -> Dict[str, Any]:
         """Enhanced architect with RAG capabilities."""
         system_prompt = f"""
         You are a {cloud_provider.upper()} {domain} Domain Architect.
@@ -203,36 +415,32 @@ def create_enhanced_architect_agent(agent_name: str, domain: str, cloud_provider
         messages = [{"role": "system", "content": system_prompt}]
         
         # Use RAG tools to gather information
-        context = ""
-        for tool in rag_tools:
-            try:
-                result = tool.func(state['user_problem'])
-                context += f"\n{tool.name}: {result}\n"
-            except Exception as e:
-                context += f"\n{tool.name}: Error - {str(e)}\n"
+        context = _gather_rag_context(rag, rag_tools, state['user_problem'], state.get("rag_cache", {}))
         
         messages.append({"role": "user", "content": f"Context: {context}\n\nDesign the {domain} architecture."})
         
         # Process with LLM
         response = {"role": "assistant", "content": f"Enhanced {domain} architecture design with RAG context."}
         
-        new_state = state.copy()
-        new_state["messages"].append(response)
-        new_state["architecture_components"][domain] = {
-            "recommendations": response["content"],
-            "agent": agent_name,
-            "rag_context": context
+        return {
+            "messages": [response],
+            "architecture_components": {
+                domain: {
+                    "recommendations": response["content"],
+                    "agent": agent_name,
+                    "rag_context": context
+                }
+            }
         }
-        
-        return new_state
     
     return enhanced_architect
 
 def create_enhanced_validator_agent(agent_name: str, domain: str, cloud_provider: str = "aws"):
     """Create an enhanced validator agent with RAG tools."""
+    rag = _get_rag(cloud_provider)
     rag_tools = create_validator_rag_tools(cloud_provider)
     
-    def enhanced_validator(state: CloudyIntelState) -> CloudyIntelState:
+    def enhanced_validator(state: CloudyIntelState) -> Dict[str, Any]:
         """Enhanced validator with RAG capabilities."""
         system_prompt = f"""
         You are a {cloud_provider.upper()} {domain} Validator.
@@ -252,43 +460,34 @@ def create_enhanced_validator_agent(agent_name: str, domain: str, cloud_provider
         messages = [{"role": "system", "content": system_prompt}]
         
         # Use RAG tools to gather information
-        context = ""
-        for tool in rag_tools:
-            try:
-                result = tool.func(f"{domain} validation")
-                context += f"\n{tool.name}: {result}\n"
-            except Exception as e:
-                context += f"\n{tool.name}: Error - {str(e)}\n"
+        context = _gather_rag_context(rag, rag_tools, f"{domain} validation", state.get("rag_cache", {}))
         
         messages.append({"role": "user", "content": f"Context: {context}\n\nValidate the {domain} architecture."})
         
         # Process with LLM
         response = {"role": "assistant", "content": f"Enhanced {domain} validation with RAG context."}
         
-        new_state = state.copy()
-        new_state["messages"].append(response)
-        
         validation_feedback = {
             "domain": domain,
             "agent": agent_name,
             "feedback": response["content"],
-            "has_errors": "error" in response["content"].lower(),
+            "has_errors": bool(_ERROR_RE.search(response["content"])),
             "rag_context": context
         }
         
-        if "validation_feedback" not in new_state:
-            new_state["validation_feedback"] = []
-        new_state["validation_feedback"].append(validation_feedback)
-        
-        return new_state
+        return {
+            "messages": [response],
+            "validation_feedback": [validation_feedback]
+        }
     
     return enhanced_validator
 
 def create_enhanced_auditor_agent(agent_name: str, pillar: str, cloud_provider: str = "aws"):
     """Create an enhanced auditor agent with RAG tools."""
+    rag = _get_rag(cloud_provider)
     rag_tools = create_auditor_rag_tools(cloud_provider)
     
-    def enhanced_auditor(state: CloudyIntelState) -> CloudyIntelState:
+    def enhanced_auditor(state: CloudyIntelState) -> Dict[str, Any]:
         """Enhanced auditor with RAG capabilities."""
         system_prompt = f"""
         You are a {cloud_provider.upper()} {pillar} Auditor.
@@ -308,34 +507,24 @@ def create_enhanced_auditor_agent(agent_name: str, pillar: str, cloud_provider:
         messages = [{"role": "system", "content": system_prompt}]
         
         # Use RAG tools to gather information
-        context = ""
-        for tool in rag_tools:
-            try:
-                result = tool.func(f"{pillar} audit")
-                context += f"\n{tool.name}: {result}\n"
-            except Exception as e:
-                context += f"\n{tool.name}: Error - {str(e)}\n"
+        context = _gather_rag_context(rag, rag_tools, f"{pillar} audit", state.get("rag_cache", {}))
         
         messages.append({"role": "user", "content": f"Context: {context}\n\nAudit the architecture for {pillar}."})
         
         # Process with LLM
         response = {"role": "assistant", "content": f"Enhanced {pillar} audit with RAG context."}
         
-        new_state = state.copy()
-        new_state["messages"].append(response)
-        
         audit_feedback = {
             "pillar": pillar,
             "agent": agent_name,
             "feedback": response["content"],
-            "has_flaws": "flaw" in response["content"].lower() or "issue" in response["content"].lower(),
+            "has_flaws": bool(_FLAW_RE.search(response["content"])),
             "rag_context": context
         }
         
-        if "audit_feedback" not in new_state:
-            new_state["audit_feedback"] = []
-        new_state["audit_feedback"].append(audit_feedback)
-        
-        return new_state
+        return {
+            "messages": [response],
+            "audit_feedback": [audit_feedback]
+        }
     
     return enhanced_auditor
@@ -1,63 +1,171 @@
-from typing import Dict, Any, List
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, FrozenSet, Tuple
 from cloudy_intel_state import CloudyIntelState, Phase, check_iteration_limit
 
+try:
+    import ahocorasick
+except ImportError:  # optional; routing falls back to the regex scan below
+    ahocorasick = None
+
+# Domain keywords, hoisted so they are built once rather than on every routing call.
+# Every keyword matches as a substring, so compounds and inflections still hit
+# ('postgresql', 'elasticache', 'networking', 'containerized', 'archived').
+_STORAGE_KW = frozenset({
+    'store', 'storage', 'data', 'file', 'backup', 'archive', 's3', 'bucket',
+    'volume', 'disk', 'nas', 'filesystem', 'retention', 'lifecycle'
+})
+_STORAGE_PHRASES = ('object storage', 'block storage', 'cold storage', 'hot storage')
+
+_DB_KW = frozenset({
+    'database', 'db', 'sql', 'nosql', 'query', 'table', 'index', 'transaction',
+    'rds', 'dynamodb', 'postgres', 'mysql', 'oracle', 'mongodb',
+    'redis', 'cache', 'analytics', 'reporting'
+})
+_DB_PHRASES = ('sql server', 'data warehouse')
+
+_COMPUTE_KW = frozenset({
+    'compute', 'server', 'instance', 'cpu', 'memory', 'processing', 'application',
+    'api', 'service', 'microservice', 'container', 'docker', 'kubernetes',
+    'lambda', 'function', 'serverless', 'ec2', 'ecs', 'eks', 'fargate'
+})
+_COMPUTE_PHRASES = ()
+
+_NET_KW = frozenset({
+    'network', 'vpc', 'subnet', 'dns', 'cdn', 'cloudfront', 'route53', 'vpn', 'nat',
+    'firewall', 'routing', 'bandwidth', 'latency', 'connectivity'
+})
+_NET_PHRASES = ('security group', 'load balancer', 'direct connect')
+
+# Keyword tables in the order agents are reported
+_DOMAIN_KEYWORDS = (
+    ("storage_architect", _STORAGE_KW, _STORAGE_PHRASES),
+    ("database_architect", _DB_KW, _DB_PHRASES),
+    ("compute_architect", _COMPUTE_KW, _COMPUTE_PHRASES),
+    ("network_architect", _NET_KW, _NET_PHRASES),
+)
+
+# Domain key each architect's tasks and components are stored under
+AGENT_TO_DOMAIN = {
+    "compute_architect": "compute",
+    "network_architect": "network",
+    "storage_architect": "storage",
+    "database_architect": "database",
+}
+
+def _build_keyword_agents() -> Dict[str, FrozenSet[str]]:
+    """Map each keyword to the agents it selects.
+    
+    A keyword also selects the agents of every keyword inside it (e.g.
+    'database' contains 'data', 'sql server' contains 'server'), since the
+    regex scan below reports only the longest keyword at each position.
+    """
+    keyword_agents: Dict[str, set] = {}
+    for agent, words, phrases in _DOMAIN_KEYWORDS:
+        for keyword in (*words, *phrases):
+            keyword_agents.setdefault(keyword, set()).add(agent)
+    
+    return {
+        keyword: frozenset(
+            agent
+            for other, agents in keyword_agents.items() if other in keyword
+            for agent in agents
+        )
+        for keyword in keyword_agents
+    }
+
+_KEYWORD_AGENTS = _build_keyword_agents()
+
+def _alternation(keywords) -> str:
+    # Longest first so a keyword never loses to one of its own prefixes
+    return "|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+
+# One pattern for every domain. The lookahead tries every position of the text,
+# so overlapping keywords ('sql' inside 'nosql') are all found in one scan.
+_KEYWORD_RE = re.compile("(?=(" + _alternation(_KEYWORD_AGENTS) + "))")
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over every keyword, valued by the agents it selects."""
+    automaton = ahocorasick.Automaton()
+    for keyword, agents in _KEYWORD_AGENTS.items():
+        automaton.add_word(keyword, agents)
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+_N_DOMAINS = len(_DOMAIN_KEYWORDS)
+
+def _match_keyword_agents(text: str) -> set:
+    """Union of agents selected by the keywords in ``text``, in one pass over it.
+    
+    The scan stops early once every domain has been selected.
+    """
+    matched = set()
+    if _KEYWORD_AUTOMATON is None:
+        for match in _KEYWORD_RE.finditer(text):
+            matched |= _KEYWORD_AGENTS[match.group(1)]
+            if len(matched) == _N_DOMAINS:
+                break
+        return matched
+    
+    for _, agents in _KEYWORD_AUTOMATON.iter(text):
+        matched |= agents
+        if len(matched) == _N_DOMAINS:
+            break
+    return matched
+
+# Fallback when no domain is detected: every architect, for comprehensive coverage
+_ALL_ARCHITECTS = ("compute_architect", "network_architect", "storage_architect", "database_architect")
+
+# Abbreviations expanded during normalization, so they match and share a cache entry.
+# "db" is already a keyword; expanding it would also match "data" and pull in storage.
+_ABBREVIATIONS = {"lb": "load balancer"}
+_ABBREVIATION_RE = re.compile(r"\b(?:" + "|".join(_ABBREVIATIONS) + r")\b")
+
+def _normalize_problem(user_problem: str) -> str:
+    """Lowercase, collapse whitespace and expand abbreviations."""
+    normalized = " ".join(user_problem.lower().split())
+    return _ABBREVIATION_RE.sub(lambda match: _ABBREVIATIONS[match.group()], normalized)
+
+@lru_cache(maxsize=4096)
+def _determine_relevant_agents_cached(normalized_problem: str) -> Tuple[str, ...]:
+    """Keyword routing for a normalized problem; memoized since phrasings recur across runs."""
+    # Single pass over the problem text for all four domains
+    matched = _match_keyword_agents(normalized_problem)
+    
+    relevant_agents = tuple(agent for agent, _, _ in _DOMAIN_KEYWORDS if agent in matched)
+    
+    # If no specific domains are detected, default to all agents for comprehensive coverage
+    return relevant_agents or _ALL_ARCHITECTS
+
 def determine_relevant_agents(user_problem: str) -> List[str]:
     """
     Intelligently determine which architect agents are relevant based on the user's problem.
     This prevents unnecessary token usage by only running relevant agents.
     """
-    problem_lower = user_problem.lower()
-    relevant_agents = []
-    
-    # Storage-related keywords
-    storage_keywords = [
-        'store', 'storage', 'data', 'file', 'backup', 'archive', 's3', 'bucket',
-        'volume', 'disk', 'nas', 'filesystem', 'object storage', 'block storage',
-        'retention', 'lifecycle', 'cold storage', 'hot storage'
-    ]
-    
-    # Database-related keywords  
-    database_keywords = [
-        'database', 'db', 'sql', 'nosql', 'query', 'table', 'index', 'transaction',
-        'rds', 'dynamodb', 'postgres', 'mysql', 'oracle', 'sql server', 'mongodb',
-        'redis', 'cache', 'data warehouse', 'analytics', 'reporting'
-    ]
-    
-    # Compute-related keywords
-    compute_keywords = [
-        'compute', 'server', 'instance', 'cpu', 'memory', 'processing', 'application',
-        'api', 'service', 'microservice', 'container', 'docker', 'kubernetes',
-        'lambda', 'function', 'serverless', 'ec2', 'ecs', 'eks', 'fargate'
-    ]
-    
-    # Network-related keywords
-    network_keywords = [
-        'network', 'vpc', 'subnet', 'security group', 'load balancer', 'dns',
-        'cdn', 'cloudfront', 'route53', 'vpn', 'direct connect', 'nat',
-        'firewall', 'routing', 'bandwidth', 'latency', 'connectivity'
-    ]
-    
-    # Check for storage relevance
-    if any(keyword in problem_lower for keyword in storage_keywords):
-        relevant_agents.append("storage_architect")
-    
-    # Check for database relevance
-    if any(keyword in problem_lower for keyword in database_keywords):
-        relevant_agents.append("database_architect")
-    
-    # Check for compute relevance
-    if any(keyword in problem_lower for keyword in compute_keywords):
-        relevant_agents.append("compute_architect")
-    
-    # Check for network relevance
-    if any(keyword in problem_lower for keyword in network_keywords):
-        relevant_agents.append("network_architect")
-    
-    # If no specific domains are detected, default to all agents for comprehensive coverage
-    if not relevant_agents:
-        relevant_agents = ["compute_architect", "network_architect", "storage_architect", "database_architect"]
+    # A fresh list per call, so callers may modify it without touching the cache
+    return list(_determine_relevant_agents_cached(_normalize_problem(user_problem)))
+
+def determine_relevant_agents_batch(user_problems: List[str]) -> List[List[str]]:
+    """Route several problems at once, scanning each distinct normalized problem once.
     
-    return relevant_agents
+    Results are returned in input order.
+    """
+    normalized = [_normalize_problem(problem) for problem in user_problems]
+    routed = {problem: _determine_relevant_agents_cached(problem) for problem in dict.fromkeys(normalized)}
+    return [list(routed[problem]) for problem in normalized]
+
+# Validator that checks each architect's output
+_VALIDATOR_FOR_ARCHITECT = {
+    agent: agent.replace("_architect", "_validator") for agent, _, _ in _DOMAIN_KEYWORDS
+}
+
+# Every pillar auditor runs on every audit pass
+_AUDITORS = frozenset({
+    "security_auditor", "cost_auditor", "reliability_auditor",
+    "performance_auditor", "operational_excellence_auditor",
+})
 
 def phase_router(state: CloudyIntelState) -> str:
     """
@@ -78,36 +186,22 @@ def inner_loop_router(state: CloudyIntelState) -> str:
     """
     Inner loop: Routes back to architects if factual errors exist.
     Routes to audit phase if no factual errors.
+    State resets for the new iteration happen in prepare_validation_retry.
     """
     if state["factual_errors_exist"]:
-        # Reset for new iteration
-        new_state = state.copy()
-        new_state["current_phase"] = Phase.GENERATE
-        new_state["iteration_count"] += 1
-        new_state["validation_feedback"] = []  # Clear for new iteration
         return "architect_supervisor"
     else:
-        # Move to audit phase
-        new_state = state.copy()
-        new_state["current_phase"] = Phase.AUDIT
         return "pillar_audit_supervisor"
 
 def outer_loop_router(state: CloudyIntelState) -> str:
     """
     Outer loop: Routes back to architects if design flaws exist.
     Routes to completion if no design flaws.
+    State resets for the new iteration happen in prepare_audit_retry.
     """
     if state["design_flaws_exist"]:
-        # Reset for new iteration
-        new_state = state.copy()
-        new_state["current_phase"] = Phase.GENERATE
-        new_state["iteration_count"] += 1
-        new_state["audit_feedback"] = []  # Clear for new iteration
         return "architect_supervisor"
     else:
-        # Architecture is complete
-        new_state = state.copy()
-        new_state["current_phase"] = Phase.COMPLETE
         return "final_presenter"
 
 def agent_completion_router(state: CloudyIntelState) -> str:
@@ -115,12 +209,15 @@ def agent_completion_router(state: CloudyIntelState) -> str:
     Routes based on which agents have completed their tasks.
     Uses intelligent filtering to only require relevant agents.
     """
+    # Build the set once per call; each membership check is then O(1)
+    done = set(state["completed_agents"])
+    
     if state["current_phase"] == Phase.GENERATE:
         # Determine which agents are actually needed based on the problem
         required_agents = determine_relevant_agents(state["user_problem"])
         
         # Check if all relevant architects are done
-        if all(agent in state["completed_agents"] for agent in required_agents):
+        if done.issuperset(required_agents):
             return "move_to_validation"
         else:
             return "continue_generation"
@@ -128,17 +225,16 @@ def agent_completion_router(state: CloudyIntelState) -> str:
     elif state["current_phase"] == Phase.VALIDATE:
         # Determine which validators are needed based on the original problem
         relevant_architects = determine_relevant_agents(state["user_problem"])
-        required_agents = [agent.replace("_architect", "_validator") for agent in relevant_architects]
+        required_agents = [_VALIDATOR_FOR_ARCHITECT[agent] for agent in relevant_architects]
         
-        if all(agent in state["completed_agents"] for agent in required_agents):
+        if done.issuperset(required_agents):
             return "evaluate_validation"
         else:
             return "continue_validation"
     
     elif state["current_phase"] == Phase.AUDIT:
         # All auditors are always needed for comprehensive quality assessment
-        required_agents = ["security_auditor", "cost_auditor", "reliability_auditor", "performance_auditor", "operational_excellence_auditor"]
-        if all(agent in state["completed_agents"] for agent in required_agents):
+        if _AUDITORS <= done:
             return "evaluate_audit"
         else:
             return "continue_audit"
@@ -161,9 +257,6 @@ def evaluate_validation_feedback(state: CloudyIntelState) -> str:
     has_errors = any(feedback.get("has_errors", False) for feedback in state["validation_feedback"])
     
     if has_errors:
-        # Update state to indicate factual errors exist
-        new_state = state.copy()
-        new_state["factual_errors_exist"] = True
         return "return_to_architects"
     else:
         return "move_to_audit"
@@ -177,19 +270,51 @@ def evaluate_audit_feedback(state: CloudyIntelState) -> str:
     has_flaws = any(feedback.get("has_flaws", False) for feedback in state["audit_feedback"])
     
     if has_flaws:
-        # Update state to indicate design flaws exist
-        new_state = state.copy()
-        new_state["design_flaws_exist"] = True
         return "return_to_architects"
     else:
         return "complete"
 
-def force_completion(state: CloudyIntelState) -> CloudyIntelState:
+# =============================================================================
+# STATE PREPARATION NODES
+# Routers only pick the next edge; these nodes apply the matching state updates.
+# =============================================================================
+
+def prepare_validation_evaluation(state: CloudyIntelState) -> Dict[str, Any]:
+    """Record whether validation feedback reported factual errors."""
+    has_errors = any(feedback.get("has_errors", False) for feedback in state["validation_feedback"])
+    return {"factual_errors_exist": has_errors}
+
+def prepare_audit_evaluation(state: CloudyIntelState) -> Dict[str, Any]:
+    """Record whether audit feedback reported design flaws."""
+    has_flaws = any(feedback.get("has_flaws", False) for feedback in state["audit_feedback"])
+    return {"design_flaws_exist": has_flaws}
+
+def prepare_validation_retry(state: CloudyIntelState) -> Dict[str, Any]:
+    """Start a new iteration after validation found factual errors.
+    
+    The feedback is kept for architect_supervisor, which reads it and then clears it.
+    """
+    return {
+        "current_phase": Phase.GENERATE,
+        "iteration_count": state["iteration_count"] + 1
+    }
+
+def prepare_audit_retry(state: CloudyIntelState) -> Dict[str, Any]:
+    """Start a new iteration after the audit found design flaws.
+    
+    The feedback is kept for architect_supervisor, which reads it and then clears it.
+    """
+    return {
+        "current_phase": Phase.GENERATE,
+        "iteration_count": state["iteration_count"] + 1
+    }
+
+def force_completion(state: CloudyIntelState) -> Dict[str, Any]:
     """Force completion when iteration limit is reached."""
-    new_state = state.copy()
-    new_state["current_phase"] = Phase.COMPLETE
-    new_state["messages"].append({
-        "role": "system",
-        "content": "Maximum iterations reached. Forcing completion with current architecture."
-    })
-    return new_state
+    return {
+        "current_phase": Phase.COMPLETE,
+        "messages": [{
+            "role": "system",
+            "content": "Maximum iterations reached. Forcing completion with current architecture."
+        }]
+    }
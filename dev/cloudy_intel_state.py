@@ -1,7 +1,8 @@
-from typing import TypedDict, Annotated, List, Dict, Any, Optional
+from typing import TypedDict, Annotated, List, Dict, Any, Optional, get_type_hints
 from langgraph.graph import add_messages
 from enum import Enum
 from datetime import datetime
+import hashlib
 import uuid
 
 class Phase(str, Enum):
@@ -10,10 +11,23 @@ class Phase(str, Enum):
     AUDIT = "audit"
     COMPLETE = "complete"
 
+def append_or_reset(left: List, right: Optional[List]) -> List:
+    """Reducer for list fields: append the update, or reset the list when given None."""
+    if right is None:
+        return []
+    return left + right
+
+def merge_or_reset(left: Dict, right: Optional[Dict]) -> Dict:
+    """Reducer for dict fields: merge the update, or reset the dict when given None."""
+    if right is None:
+        return {}
+    return {**left, **right}
+
 class CloudyIntelState(TypedDict):
     # Core workflow state
     messages: Annotated[List, add_messages]
     user_problem: str
+    problem_hash: str  # Stable cache key for user_problem, computed once per run
     current_phase: Phase
     iteration_count: int
     
@@ -24,15 +38,19 @@ class CloudyIntelState(TypedDict):
     
     # Architecture components
     proposed_architecture: Dict[str, Any]
-    architecture_components: Dict[str, Dict[str, Any]]  # domain -> component details
+    architecture_components: Annotated[Dict[str, Dict[str, Any]], merge_or_reset]  # domain -> component details
+    
+    # RAG context precomputed once per run: query -> formatted documentation context
+    # (holds only a failure marker when precomputation failed; see cloudy_intel_rag)
+    rag_cache: Dict[str, str]
     
     # Feedback systems
-    validation_feedback: List[Dict[str, Any]]
-    audit_feedback: List[Dict[str, Any]]
+    validation_feedback: Annotated[List[Dict[str, Any]], append_or_reset]
+    audit_feedback: Annotated[List[Dict[str, Any]], append_or_reset]
     
     # Agent coordination
     active_agents: List[str]
-    completed_agents: List[str]
+    completed_agents: Annotated[List[str], append_or_reset]
     
     # Quality gates
     factual_errors_exist: bool
@@ -52,6 +70,7 @@ def create_initial_state(user_problem: str, cloud_provider: str = "aws") -> Clou
     return CloudyIntelState(
         messages=[],
         user_problem=user_problem,
+        problem_hash=hashlib.blake2b(user_problem.encode("utf-8"), digest_size=16).hexdigest(),
         current_phase=Phase.GENERATE,
         iteration_count=0,
         decomposed_tasks={},
@@ -59,6 +78,7 @@ def create_initial_state(user_problem: str, cloud_provider: str = "aws") -> Clou
         supervisor_analysis=None,
         proposed_architecture={},
         architecture_components={},
+        rag_cache={},
         validation_feedback=[],
         audit_feedback=[],
         active_agents=[],
@@ -72,26 +92,36 @@ def create_initial_state(user_problem: str, cloud_provider: str = "aws") -> Clou
         session_id=str(uuid.uuid4())
     )
 
-def update_validation_feedback(state: CloudyIntelState, feedback: List[Dict[str, Any]]) -> CloudyIntelState:
-    """Update validation feedback and set factual_errors_exist flag."""
-    new_state = state.copy()
-    new_state["validation_feedback"] = feedback
-    new_state["factual_errors_exist"] = len(feedback) > 0
-    return new_state
+# Nodes return partial updates; the reducers above merge them into the graph state.
+
+def update_validation_feedback(state: CloudyIntelState, feedback: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Record validation feedback and set factual_errors_exist flag."""
+    return {"validation_feedback": feedback, "factual_errors_exist": bool(feedback)}
+
+def update_audit_feedback(state: CloudyIntelState, feedback: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Record audit feedback and set design_flaws_exist flag."""
+    return {"audit_feedback": feedback, "design_flaws_exist": bool(feedback)}
+
+def mark_agent_complete(state: CloudyIntelState, agent_name: str) -> Dict[str, Any]:
+    """Return the update marking an agent as completed."""
+    if agent_name in state["completed_agents"]:
+        return {}
+    return {"completed_agents": [agent_name]}
 
-def update_audit_feedback(state: CloudyIntelState, feedback: List[Dict[str, Any]]) -> CloudyIntelState:
-    """Update audit feedback and set design_flaws_exist flag."""
-    new_state = state.copy()
-    new_state["audit_feedback"] = feedback
-    new_state["design_flaws_exist"] = len(feedback) > 0
-    return new_state
+# Reducer for each Annotated field, used to apply updates outside of a graph run
+_STATE_REDUCERS = {
+    key: hint.__metadata__[0]
+    for key, hint in get_type_hints(CloudyIntelState, include_extras=True).items()
+    if hasattr(hint, "__metadata__")
+}
 
-def mark_agent_complete(state: CloudyIntelState, agent_name: str) -> CloudyIntelState:
-    """Mark an agent as completed."""
-    new_state = state.copy()
-    if agent_name not in new_state["completed_agents"]:
-        new_state["completed_agents"].append(agent_name)
-    return new_state
+def apply_update(state: CloudyIntelState, update: Dict[str, Any]) -> CloudyIntelState:
+    """Apply a node's partial update to a state, as the graph would (for tests and demos)."""
+    new_state = dict(state)
+    for key, value in update.items():
+        reducer = _STATE_REDUCERS.get(key)
+        new_state[key] = reducer(state[key], value) if reducer and key in state else value
+    return CloudyIntelState(**new_state)
 
 def check_iteration_limit(state: CloudyIntelState, max_iterations: int = 5) -> bool:
     """Prevent infinite loops."""
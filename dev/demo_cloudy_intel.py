@@ -5,8 +5,13 @@ CloudyIntel Demo Script
 This script demonstrates the complete CloudyIntel system with a simple example.
 """
 
+import io
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,18 +20,32 @@ load_dotenv(override=True)
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def demo_basic_workflow():
+# Import everything once; the demos check IMPORT_ERRORS instead of re-importing
+from cloudy_intel_imports import IMPORT_ERRORS, require
+
+if "cloudy_intel_state" not in IMPORT_ERRORS:
+    from cloudy_intel_state import create_initial_state, Phase
+if "cloudy_intel_agents" not in IMPORT_ERRORS:
+    from cloudy_intel_agents import architect_supervisor, compute_architect
+if "cloudy_intel_routing" not in IMPORT_ERRORS:
+    from cloudy_intel_routing import phase_router, inner_loop_router, outer_loop_router
+if "cloudy_intel_rag" not in IMPORT_ERRORS:
+    from cloudy_intel_rag import CloudyIntelRAG, create_architect_rag_tools
+if "cloudy_intel_main" not in IMPORT_ERRORS:
+    from cloudy_intel_main import CloudyIntel
+
+def demo_basic_workflow(cloudy_intel=None):
     """Demonstrate basic CloudyIntel workflow."""
     print("🚀 CLOUDYINTEL DEMO")
     print("=" * 50)
     
     try:
-        from cloudy_intel_main import CloudyIntel
-        
-        # Create CloudyIntel instance
-        print("📦 Creating CloudyIntel instance...")
-        cloudy_intel = CloudyIntel(cloud_provider="aws", use_rag=False)
-        print("✅ CloudyIntel instance created successfully")
+        # Create a CloudyIntel instance unless main() passed its shared one
+        if cloudy_intel is None:
+            print("📦 Creating CloudyIntel instance...")
+            require("cloudy_intel_main")
+            cloudy_intel = CloudyIntel(cloud_provider="aws", use_rag=False)
+            print("✅ CloudyIntel instance created successfully")
         
         # Define a simple problem
         user_problem = "Deploy a simple web application with a database"
@@ -37,12 +56,20 @@ def demo_basic_workflow():
         result = cloudy_intel.run(user_problem, max_iterations=2)
         
         # Display results
-        print("\n📊 RESULTS:")
-        print(f"Phase: {result.get('current_phase', 'N/A')}")
-        print(f"Iterations: {result.get('iteration_count', 0)}")
-        print(f"Components: {len(result.get('architecture_components', {}))}")
-        print(f"Validation Feedback: {len(result.get('validation_feedback', []))}")
-        print(f"Audit Feedback: {len(result.get('audit_feedback', []))}")
+        phase = result.get('current_phase', 'N/A')
+        iterations = result.get('iteration_count', 0)
+        # "or ()" avoids allocating an empty default container for each missing field
+        components = len(result.get('architecture_components') or ())
+        validation = len(result.get('validation_feedback') or ())
+        audit = len(result.get('audit_feedback') or ())
+        sys.stdout.write(
+            "\n📊 RESULTS:\n"
+            f"Phase: {phase}\n"
+            f"Iterations: {iterations}\n"
+            f"Components: {components}\n"
+            f"Validation Feedback: {validation}\n"
+            f"Audit Feedback: {audit}\n"
+        )
         
         # Get architecture summary
         summary = cloudy_intel.get_architecture_summary(result)
@@ -61,7 +88,7 @@ def demo_state_management():
     print("=" * 40)
     
     try:
-        from cloudy_intel_state import create_initial_state, Phase
+        require("cloudy_intel_state")
         
         # Create initial state
         state = create_initial_state("Test problem", "aws")
@@ -90,8 +117,7 @@ def demo_agent_hierarchy():
     print("=" * 40)
     
     try:
-        from cloudy_intel_agents import architect_supervisor, compute_architect
-        from cloudy_intel_state import create_initial_state
+        require("cloudy_intel_agents", "cloudy_intel_state")
         
         # Create state
         state = create_initial_state("Test problem", "aws")
@@ -121,8 +147,7 @@ def demo_routing_logic():
     print("=" * 40)
     
     try:
-        from cloudy_intel_routing import phase_router, inner_loop_router, outer_loop_router
-        from cloudy_intel_state import create_initial_state, Phase
+        require("cloudy_intel_routing", "cloudy_intel_state")
         
         # Create state
         state = create_initial_state("Test problem", "aws")
@@ -157,7 +182,7 @@ def demo_rag_system():
     print("=" * 40)
     
     try:
-        from cloudy_intel_rag import CloudyIntelRAG, create_architect_rag_tools
+        require("cloudy_intel_rag")
         
         # Create RAG system
         print("📚 Creating RAG system...")
@@ -178,25 +203,78 @@ def demo_rag_system():
         print(f"❌ RAG system demo failed: {str(e)}")
         return False
 
+class _ThreadLocalStdout(io.TextIOBase):
+    """Stdout that sends each capturing thread's writes to that thread's own buffer.
+    
+    contextlib.redirect_stdout swaps sys.stdout for the whole process, so it
+    cannot keep the output of demos running in parallel apart.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    @contextmanager
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+def _run_captured(stdout, demo_func):
+    """Run one demo in a worker thread, returning its result and printed output."""
+    with stdout.capture() as buffer:
+        ok = demo_func()
+    return ok, buffer.getvalue()
+
 def main():
     """Run all demos."""
     print("🎮 CLOUDYINTEL COMPLETE DEMO")
     print("=" * 60)
     
+    # Compile the graph once and hand the instance to the demos that run the workflow;
+    # if this fails, demo_basic_workflow retries and reports the error itself
+    cloudy_intel = None
+    if "cloudy_intel_main" not in IMPORT_ERRORS:
+        try:
+            cloudy_intel = CloudyIntel(cloud_provider="aws", use_rag=False)
+        except Exception:
+            pass
+    
     demos = [
         ("State Management", demo_state_management),
         ("Agent Hierarchy", demo_agent_hierarchy),
         ("Routing Logic", demo_routing_logic),
         ("RAG System", demo_rag_system),
-        ("Basic Workflow", demo_basic_workflow)
+        ("Basic Workflow", partial(demo_basic_workflow, cloudy_intel))
     ]
     
     passed = 0
     total = len(demos)
     
-    for demo_name, demo_func in demos:
+    # The demos are independent and I/O-bound on the LLM/RAG APIs, so run them in parallel
+    # and print each one's captured output afterwards in the usual order
+    stdout = _ThreadLocalStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=len(demos)) as executor:
+            futures = [executor.submit(_run_captured, stdout, demo_func) for _, demo_func in demos]
+            outcomes = [future.result() for future in futures]
+    finally:
+        sys.stdout = stdout.stream
+    
+    for (demo_name, _), (ok, output) in zip(demos, outcomes):
         print(f"\n🎯 Running {demo_name} Demo...")
-        if demo_func():
+        print(output, end="")
+        if ok:
             print(f"✅ {demo_name} demo completed successfully")
             passed += 1
         else:
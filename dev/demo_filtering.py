@@ -3,61 +3,72 @@
 Demonstration of the intelligent agent filtering system.
 """
 
+import re
+import sys
+from functools import lru_cache
+
+def _keywords(*words):
+    """Freeze a domain's single-word keywords."""
+    return frozenset(sys.intern(word) for word in words)
+
+# Domain keywords, built once at import
+STORAGE_KWS = _keywords(
+    'store', 'storage', 'data', 'file', 'backup', 'archive', 's3', 'bucket',
+    'volume', 'disk', 'nas', 'filesystem', 'retention', 'lifecycle'
+)
+STORAGE_PHRASES = ('object storage', 'block storage', 'cold storage', 'hot storage')
+
+DATABASE_KWS = _keywords(
+    'database', 'db', 'sql', 'nosql', 'query', 'table', 'index', 'transaction',
+    'rds', 'dynamodb', 'postgres', 'mysql', 'oracle', 'mongodb',
+    'redis', 'cache', 'analytics', 'reporting'
+)
+DATABASE_PHRASES = ('sql server', 'data warehouse')
+
+COMPUTE_KWS = _keywords(
+    'compute', 'server', 'instance', 'cpu', 'memory', 'processing', 'application',
+    'api', 'service', 'microservice', 'container', 'docker', 'kubernetes',
+    'lambda', 'function', 'serverless', 'ec2', 'ecs', 'eks', 'fargate'
+)
+COMPUTE_PHRASES = ()
+
+NETWORK_KWS = _keywords(
+    'network', 'vpc', 'subnet', 'dns', 'cdn', 'cloudfront', 'route53', 'vpn', 'nat',
+    'firewall', 'routing', 'bandwidth', 'latency', 'connectivity'
+)
+NETWORK_PHRASES = ('security group', 'load balancer', 'direct connect')
+
+# Domains in the order agents are reported
+_DOMAINS = (
+    ("storage_architect", STORAGE_KWS, STORAGE_PHRASES),
+    ("database_architect", DATABASE_KWS, DATABASE_PHRASES),
+    ("compute_architect", COMPUTE_KWS, COMPUTE_PHRASES),
+    ("network_architect", NETWORK_KWS, NETWORK_PHRASES),
+)
+
+# Fallback when no domain keyword matches: every architect, for comprehensive coverage
+DEFAULT_AGENTS = ("compute_architect", "network_architect", "storage_architect", "database_architect")
+
+# One pattern per domain. Keywords match as substrings, so compounds and
+# inflections still count ('postgresql', 'networking', 'containers').
+_DOMAIN_PATTERNS = tuple(
+    (agent, re.compile("|".join(re.escape(kw) for kw in sorted((*words, *phrases), key=len, reverse=True))))
+    for agent, words, phrases in _DOMAINS
+)
+
 # Simulate the filtering logic
+@lru_cache(maxsize=1024)
 def determine_relevant_agents(user_problem: str):
-    """Intelligently determine which architect agents are relevant based on the user's problem."""
-    problem_lower = user_problem.lower()
-    relevant_agents = []
+    """Intelligently determine which architect agents are relevant based on the user's problem.
     
-    # Storage-related keywords
-    storage_keywords = [
-        'store', 'storage', 'data', 'file', 'backup', 'archive', 's3', 'bucket',
-        'volume', 'disk', 'nas', 'filesystem', 'object storage', 'block storage',
-        'retention', 'lifecycle', 'cold storage', 'hot storage'
-    ]
-    
-    # Database-related keywords  
-    database_keywords = [
-        'database', 'db', 'sql', 'nosql', 'query', 'table', 'index', 'transaction',
-        'rds', 'dynamodb', 'postgres', 'mysql', 'oracle', 'sql server', 'mongodb',
-        'redis', 'cache', 'data warehouse', 'analytics', 'reporting'
-    ]
-    
-    # Compute-related keywords
-    compute_keywords = [
-        'compute', 'server', 'instance', 'cpu', 'memory', 'processing', 'application',
-        'api', 'service', 'microservice', 'container', 'docker', 'kubernetes',
-        'lambda', 'function', 'serverless', 'ec2', 'ecs', 'eks', 'fargate'
-    ]
-    
-    # Network-related keywords
-    network_keywords = [
-        'network', 'vpc', 'subnet', 'security group', 'load balancer', 'dns',
-        'cdn', 'cloudfront', 'route53', 'vpn', 'direct connect', 'nat',
-        'firewall', 'routing', 'bandwidth', 'latency', 'connectivity'
-    ]
-    
-    # Check for storage relevance
-    if any(keyword in problem_lower for keyword in storage_keywords):
-        relevant_agents.append("storage_architect")
-    
-    # Check for database relevance
-    if any(keyword in problem_lower for keyword in database_keywords):
-        relevant_agents.append("database_architect")
-    
-    # Check for compute relevance
-    if any(keyword in problem_lower for keyword in compute_keywords):
-        relevant_agents.append("compute_architect")
-    
-    # Check for network relevance
-    if any(keyword in problem_lower for keyword in network_keywords):
-        relevant_agents.append("network_architect")
-    
-    # If no specific domains are detected, default to all agents for comprehensive coverage
-    if not relevant_agents:
-        relevant_agents = ["compute_architect", "network_architect", "storage_architect", "database_architect"]
+    Results are memoized per problem string, so they are returned as an immutable tuple.
+    """
+    problem_lower = user_problem.lower()
     
-    return relevant_agents
+    # One C-level scan per domain; with no specific domain, run them all
+    return tuple(
+        agent for agent, pattern in _DOMAIN_PATTERNS if pattern.search(problem_lower)
+    ) or DEFAULT_AGENTS
 
 # Test cases
 test_cases = [
@@ -73,7 +84,7 @@ print("=" * 50)
 for problem in test_cases:
     agents = determine_relevant_agents(problem)
     print(f"\nProblem: '{problem}'")
-    print(f"Selected agents: {agents}")
+    print(f"Selected agents: {list(agents)}")
     
     # Calculate token savings
     total_agents = 4
@@ -3,12 +3,28 @@ Example: Complete AWS RAG Workflow
 This script demonstrates the end-to-end process of setting up and using AWS documentation RAG.
 """
 
+import argparse
+import asyncio
 import os
+from glob import glob
 from aws_rag_setup import AWSDocRAGSetup, get_aws_documentation_urls
-from aws_rag_query import AWSDocRAGQuery
+from aws_rag_query import AWSDocRAGQuery, SemanticQueryCache
 
 
-def setup_rag_system():
+def _latest_mtime(directory: str) -> float:
+    """Newest modification time of any file under directory (0.0 if there are none)."""
+    paths = [p for p in glob(os.path.join(directory, "**", "*"), recursive=True) if os.path.isfile(p)]
+    return max((os.path.getmtime(p) for p in paths), default=0.0)
+
+
+def _index_fresh(vector_store_path: str, docs_directory: str) -> bool:
+    """True when the persisted vector store is newer than every source document."""
+    index_mtime = _latest_mtime(vector_store_path)
+    # An empty directory means the store was never built
+    return index_mtime > 0.0 and index_mtime >= _latest_mtime(docs_directory)
+
+
+def setup_rag_system(force_rebuild: bool = False):
     """Step 1: Setup the RAG system by processing documents"""
     print("="*80)
     print("STEP 1: Setting up RAG System")
@@ -23,6 +39,13 @@ def setup_rag_system():
         use_openai=False  # Set to True if you have OpenAI API key
     )
     
+    # Reuse the persisted store unless a source document changed since it was built;
+    # re-embedding the corpus is the expensive step
+    if not force_rebuild and _index_fresh("data/aws_vectorstore", "data/aws_docs"):
+        print("\nVector store is up to date, loading it from data/aws_vectorstore/...")
+        print("(pass --force-rebuild to re-embed the documents)")
+        return setup.load_vector_store(use_chroma=True)
+    
     # Option A: Download documentation from URLs (uncomment if needed)
     # print("\nDownloading AWS documentation...")
     # aws_urls = get_aws_documentation_urls()
@@ -46,7 +69,7 @@ def setup_rag_system():
     
     # Create vector store
     print("\nCreating vector store...")
-    vectorstore = setup.create_vector_store(chunks, use_chroma=True)
+    vectorstore = setup.create_vector_store(chunks, use_chroma=True, batch_size=256)
     
     print("\n✅ RAG setup complete!")
     return vectorstore
@@ -82,6 +105,9 @@ def query_rag_system():
             k=4
         )
         
+        # Near-duplicate questions reuse a stored answer instead of calling the LLM again
+        answer_cache = SemanticQueryCache(rag_query.embeddings, cache_path="data/semantic_cache")
+        
         # Example queries
         questions = [
             "What is AWS Lambda?",
@@ -94,28 +120,39 @@ def query_rag_system():
         print("Example Queries")
         print("-"*80)
         
-        for i, question in enumerate(questions, 1):
+        async def run_one(question):
+            """Retrieve documents and generate an answer for one question."""
+            docs = await rag_query.aretrieve_documents(question, k=3)
+            result = None
+            # Query with answer generation (requires LLM)
+            if use_openai:
+                result = await answer_cache.aget_or_compute(question, lambda: rag_query.aquery(question))
+            return docs, result
+        
+        async def run_all():
+            # The questions are independent, so their retrieval and LLM latency overlap
+            return await asyncio.gather(*(run_one(q) for q in questions), return_exceptions=True)
+        
+        outcomes = asyncio.run(run_all())
+        
+        for i, (question, outcome) in enumerate(zip(questions, outcomes), 1):
             print(f"\n📝 Query {i}: {question}")
             print("-"*80)
             
-            try:
-                # Retrieve relevant documents
-                docs = rag_query.retrieve_documents(question, k=3)
+            if isinstance(outcome, Exception):
+                print(f"\n❌ Error processing query: {outcome}")
+            else:
+                docs, result = outcome
                 print(f"\nFound {len(docs)} relevant documents:")
                 for j, doc in enumerate(docs, 1):
                     source = doc.metadata.get('source', 'Unknown')
                     print(f"  {j}. {source}")
                     print(f"     Preview: {doc.page_content[:100]}...")
                 
-                # Query with answer generation (requires LLM)
-                if use_openai:
-                    result = rag_query.query(question)
+                if result is not None:
                     print(f"\n💡 Answer: {result['answer']}")
                 else:
                     print("\n⚠️  Skipping answer generation (requires OpenAI API key or local LLM)")
-                    
-            except Exception as e:
-                print(f"\n❌ Error processing query: {e}")
             
             print("-"*80)
             
@@ -129,13 +166,21 @@ def query_rag_system():
 
 def main():
     """Main function to run the complete workflow"""
+    parser = argparse.ArgumentParser(description="AWS Documentation RAG workflow example")
+    parser.add_argument(
+        "--force-rebuild",
+        action="store_true",
+        help="Re-embed the documents even if the persisted vector store is up to date"
+    )
+    args = parser.parse_args()
+    
     print("\n" + "="*80)
     print("AWS Documentation RAG - Complete Workflow Example")
     print("="*80)
     
-    # Step 1: Setup (comment out if already done)
+    # Step 1: Setup (skipped automatically when the vector store is up to date)
     print("\n🔧 Step 1: Setup RAG System")
-    vectorstore = setup_rag_system()
+    vectorstore = setup_rag_system(force_rebuild=args.force_rebuild)
     
     if vectorstore is None:
         print("\n⚠️  Setup incomplete. Please add documents and try again.")
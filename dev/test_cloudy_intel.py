@@ -3,8 +3,12 @@
 Simple test script for CloudyIntel
 """
 
+import contextlib
+import importlib
+import io
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -13,44 +17,29 @@ load_dotenv(override=True)
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Import everything once; the tests check IMPORT_ERRORS instead of re-importing
+from cloudy_intel_imports import CLOUDY_INTEL_MODULES, IMPORT_ERRORS, require
+
+if "cloudy_intel_state" not in IMPORT_ERRORS:
+    from cloudy_intel_state import CloudyIntelState, create_initial_state, Phase
+if "cloudy_intel_agents" not in IMPORT_ERRORS:
+    from cloudy_intel_agents import architect_supervisor, compute_architect
+if "cloudy_intel_routing" not in IMPORT_ERRORS:
+    from cloudy_intel_routing import phase_router, inner_loop_router
+if "cloudy_intel_rag" not in IMPORT_ERRORS:
+    from cloudy_intel_rag import CloudyIntelRAG, create_architect_rag_tools
+if "cloudy_intel_main" not in IMPORT_ERRORS:
+    from cloudy_intel_main import CloudyIntel
+
 def test_imports():
     """Test that all modules can be imported."""
     print("🧪 Testing imports...")
     
-    try:
-        from cloudy_intel_state import CloudyIntelState, create_initial_state
-        print("✅ cloudy_intel_state imported successfully")
-    except Exception as e:
-        print(f"❌ Failed to import cloudy_intel_state: {e}")
-        return False
-    
-    try:
-        from cloudy_intel_agents import architect_supervisor, compute_architect
-        print("✅ cloudy_intel_agents imported successfully")
-    except Exception as e:
-        print(f"❌ Failed to import cloudy_intel_agents: {e}")
-        return False
-    
-    try:
-        from cloudy_intel_routing import phase_router, inner_loop_router
-        print("✅ cloudy_intel_routing imported successfully")
-    except Exception as e:
-        print(f"❌ Failed to import cloudy_intel_routing: {e}")
-        return False
-    
-    try:
-        from cloudy_intel_rag import CloudyIntelRAG, create_architect_rag_tools
-        print("✅ cloudy_intel_rag imported successfully")
-    except Exception as e:
-        print(f"❌ Failed to import cloudy_intel_rag: {e}")
-        return False
-    
-    try:
-        from cloudy_intel_main import CloudyIntel
-        print("✅ cloudy_intel_main imported successfully")
-    except Exception as e:
-        print(f"❌ Failed to import cloudy_intel_main: {e}")
-        return False
+    for module in CLOUDY_INTEL_MODULES:
+        if module in IMPORT_ERRORS:
+            print(f"❌ Failed to import {module}: {IMPORT_ERRORS[module]}")
+            return False
+        print(f"✅ {module} imported successfully")
     
     return True
 
@@ -59,7 +48,7 @@ def test_state_creation():
     print("\n🧪 Testing state creation...")
     
     try:
-        from cloudy_intel_state import create_initial_state
+        require("cloudy_intel_state")
         
         state = create_initial_state("Test problem", "aws")
         
@@ -68,6 +57,8 @@ def test_state_creation():
         assert "cloud_provider" in state
         assert "current_phase" in state
         assert "iteration_count" in state
+        assert len(state["problem_hash"]) == 32
+        assert state["problem_hash"] == create_initial_state("Test problem", "azure")["problem_hash"]
         
         print("✅ State creation test passed")
         return True
@@ -81,8 +72,7 @@ def test_agent_creation():
     print("\n🧪 Testing agent creation...")
     
     try:
-        from cloudy_intel_agents import compute_architect
-        from cloudy_intel_state import create_initial_state
+        require("cloudy_intel_state", "cloudy_intel_agents")
         
         state = create_initial_state("Test problem", "aws")
         
@@ -104,8 +94,7 @@ def test_routing_logic():
     print("\n🧪 Testing routing logic...")
     
     try:
-        from cloudy_intel_routing import phase_router, inner_loop_router
-        from cloudy_intel_state import create_initial_state, Phase
+        require("cloudy_intel_state", "cloudy_intel_routing")
         
         state = create_initial_state("Test problem", "aws")
         
@@ -130,7 +119,7 @@ def test_cloudy_intel_creation():
     print("\n🧪 Testing CloudyIntel creation...")
     
     try:
-        from cloudy_intel_main import CloudyIntel
+        require("cloudy_intel_main")
         
         # Test creation without RAG
         cloudy_intel = CloudyIntel(cloud_provider="aws", use_rag=False)
@@ -150,7 +139,7 @@ def test_simple_workflow():
     print("\n🧪 Testing simple workflow...")
     
     try:
-        from cloudy_intel_main import CloudyIntel
+        require("cloudy_intel_main")
         
         # Create CloudyIntel instance
         cloudy_intel = CloudyIntel(cloud_provider="aws", use_rag=False)
@@ -175,6 +164,18 @@ def test_simple_workflow():
         print(f"❌ Simple workflow test failed: {e}")
         return False
 
+def _run_test_by_name(test_name: str):
+    """Run one test in a worker process, returning its result and printed output.
+    
+    Tests are looked up by name on the imported module so only a string has to be
+    pickled, which also works when this file runs as __main__.
+    """
+    module = importlib.import_module("test_cloudy_intel")
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        passed = getattr(module, test_name)()
+    return passed, output.getvalue()
+
 def main():
     """Run all tests."""
     print("🚀 CLOUDYINTEL TEST SUITE")
@@ -192,8 +193,15 @@ def main():
     passed = 0
     total = len(tests)
     
-    for test in tests:
-        if test():
+    # The tests are independent, so they run in parallel worker processes. Workers
+    # are reused when there are fewer cores than tests, so module state is not
+    # isolated between tests. Output is printed in test order.
+    with ProcessPoolExecutor(max_workers=min(total, os.cpu_count() or 1)) as executor:
+        results = list(executor.map(_run_test_by_name, [test.__name__ for test in tests]))
+    
+    for test_passed, output in results:
+        print(output, end="")
+        if test_passed:
             passed += 1
     
     print(f"\n📊 TEST RESULTS: {passed}/{total} tests passed")
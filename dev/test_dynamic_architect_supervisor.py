@@ -4,17 +4,13 @@ This shows how the supervisor now uses LLM to decompose tasks instead of hardcod
 """
 
 import asyncio
-from cloudy_intel_state import create_initial_state
+from cloudy_intel_state import create_initial_state, apply_update
 from cloudy_intel_agents import architect_supervisor
 
 async def test_dynamic_architect_supervisor():
     """Test the dynamic architect supervisor with different problem types."""
     
     # Test Case 1: E-commerce website problem
-    print("=" * 60)
-    print("TEST CASE 1: E-commerce Website Architecture")
-    print("=" * 60)
-    
     ecommerce_problem = """
     I need to build a scalable e-commerce website that can handle:
     - 100,000 concurrent users during peak shopping seasons
@@ -25,19 +21,7 @@ async def test_dynamic_architect_supervisor():
     - Mobile-first responsive design
     """
     
-    state1 = create_initial_state(ecommerce_problem, "aws")
-    result1 = await architect_supervisor(state1)
-    
-    print(f"User Problem: {result1['user_problem'][:100]}...")
-    print(f"Relevant Agents: {result1['active_agents']}")
-    print(f"Supervisor Analysis: {result1['supervisor_analysis'][:200]}...")
-    print(f"Task Assignments: {list(result1['task_assignments'].keys())}")
-    
     # Test Case 2: Data Analytics problem
-    print("\n" + "=" * 60)
-    print("TEST CASE 2: Data Analytics Platform")
-    print("=" * 60)
-    
     analytics_problem = """
     I need to build a data analytics platform for:
     - Processing 10TB of IoT sensor data daily
@@ -47,19 +31,7 @@ async def test_dynamic_architect_supervisor():
     - Interactive dashboards for business users
     """
     
-    state2 = create_initial_state(analytics_problem, "aws")
-    result2 = await architect_supervisor(state2)
-    
-    print(f"User Problem: {result2['user_problem'][:100]}...")
-    print(f"Relevant Agents: {result2['active_agents']}")
-    print(f"Supervisor Analysis: {result2['supervisor_analysis'][:200]}...")
-    print(f"Task Assignments: {list(result2['task_assignments'].keys())}")
-    
     # Test Case 3: Simple web app (should trigger fewer agents)
-    print("\n" + "=" * 60)
-    print("TEST CASE 3: Simple Web Application")
-    print("=" * 60)
-    
     simple_problem = """
     I need a simple web application for a small business:
     - Basic company website with contact forms
@@ -68,19 +40,7 @@ async def test_dynamic_architect_supervisor():
     - Cost-effective solution
     """
     
-    state3 = create_initial_state(simple_problem, "aws")
-    result3 = await architect_supervisor(state3)
-    
-    print(f"User Problem: {result3['user_problem'][:100]}...")
-    print(f"Relevant Agents: {result3['active_agents']}")
-    print(f"Supervisor Analysis: {result3['supervisor_analysis'][:200]}...")
-    print(f"Task Assignments: {list(result3['task_assignments'].keys())}")
-    
     # Test Case 4: Iteration with feedback
-    print("\n" + "=" * 60)
-    print("TEST CASE 4: Iteration with Previous Feedback")
-    print("=" * 60)
-    
     # Simulate a second iteration with feedback
     state4 = create_initial_state(ecommerce_problem, "aws")
     state4["iteration_count"] = 1
@@ -101,12 +61,32 @@ async def test_dynamic_architect_supervisor():
         }
     ]
     
-    result4 = await architect_supervisor(state4)
+    cases = [
+        ("TEST CASE 1: E-commerce Website Architecture", create_initial_state(ecommerce_problem, "aws")),
+        ("TEST CASE 2: Data Analytics Platform", create_initial_state(analytics_problem, "aws")),
+        ("TEST CASE 3: Simple Web Application", create_initial_state(simple_problem, "aws")),
+        ("TEST CASE 4: Iteration with Previous Feedback", state4),
+    ]
     
-    print(f"User Problem: {result4['user_problem'][:100]}...")
-    print(f"Iteration: {result4['iteration_count']}")
-    print(f"Previous Feedback Available: {len(result4.get('validation_feedback', []))} validation, {len(result4.get('audit_feedback', []))} audit")
-    print(f"Supervisor Analysis: {result4['supervisor_analysis'][:200]}...")
+    # The cases are independent, so their supervisor LLM calls run concurrently
+    updates = await asyncio.gather(*(architect_supervisor(state) for _, state in cases))
+    
+    for i, ((label, state), update) in enumerate(zip(cases, updates)):
+        result = apply_update(state, update)
+        
+        print(("\n" if i else "") + "=" * 60)
+        print(label)
+        print("=" * 60)
+        
+        print(f"User Problem: {result['user_problem'][:100]}...")
+        if state is state4:
+            print(f"Iteration: {result['iteration_count']}")
+            print(f"Previous Feedback Available: {len(result.get('validation_feedback', []))} validation, {len(result.get('audit_feedback', []))} audit")
+            print(f"Supervisor Analysis: {result['supervisor_analysis'][:200]}...")
+        else:
+            print(f"Relevant Agents: {result['active_agents']}")
+            print(f"Supervisor Analysis: {result['supervisor_analysis'][:200]}...")
+            print(f"Task Assignments: {list(result['task_assignments'].keys())}")
 
 if __name__ == "__main__":
     asyncio.run(test_dynamic_architect_supervisor())
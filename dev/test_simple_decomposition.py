@@ -3,9 +3,32 @@
 Simple test to verify the task decomposition logic without running the full async workflow.
 """
 
+from buffered_output import buffered_output
 from cloudy_intel_state import create_initial_state, CloudyIntelState
-from cloudy_intel_routing import determine_relevant_agents
+from cloudy_intel_routing import AGENT_TO_DOMAIN, determine_relevant_agents
 
+# Built once at import rather than on every loop iteration
+_DOMAIN_DESCRIPTIONS = {
+    "compute_architect": "Compute Architect (EC2, Lambda, ECS, etc.)",
+    "network_architect": "Network Architect (VPC, ALB, CloudFront, etc.)",
+    "storage_architect": "Storage Architect (S3, EBS, EFS, etc.)",
+    "database_architect": "Database Architect (RDS, DynamoDB, ElastiCache, etc.)"
+}
+
+_TASK_TEMPLATE = """
+        Based on the user problem: "{user_problem}"
+        
+        Your specific task as {domain_desc}:
+        - Analyze the {domain} requirements for this problem
+        - Design appropriate {domain} solutions using AWS services
+        - Provide detailed configuration recommendations
+        - Consider cost, security, and performance implications
+        - Use web search for latest pricing and best practices
+        
+        Focus specifically on {domain} aspects of the architecture.
+        """
+
+@buffered_output
 def test_state_structure():
     """Test that the state structure includes the new task decomposition fields."""
     print("=== Testing State Structure ===\n")
@@ -27,6 +50,7 @@ def test_state_structure():
     
     return has_decomposed_tasks and has_task_assignments
 
+@buffered_output
 def test_relevant_agents():
     """Test that relevant agents are determined correctly."""
     print("\n=== Testing Relevant Agents Detection ===\n")
@@ -44,6 +68,7 @@ def test_relevant_agents():
         print(f"Relevant agents: {agents}")
         print()
 
+@buffered_output
 def test_task_decomposition_logic():
     """Test the task decomposition logic structure."""
     print("=== Testing Task Decomposition Logic ===\n")
@@ -59,27 +84,14 @@ def test_task_decomposition_logic():
     decomposed_tasks = {}
     task_assignments = {}
     
-    domain_descriptions = {
-        "compute_architect": "Compute Architect (EC2, Lambda, ECS, etc.)",
-        "network_architect": "Network Architect (VPC, ALB, CloudFront, etc.)",
-        "storage_architect": "Storage Architect (S3, EBS, EFS, etc.)",
-        "database_architect": "Database Architect (RDS, DynamoDB, ElastiCache, etc.)"
-    }
+    # Fill in the user problem once; braces in it are escaped for the per-agent format()
+    partial_template = _TASK_TEMPLATE.replace(
+        "{user_problem}", user_problem.replace("{", "{{").replace("}", "}}")
+    )
     
     for agent in relevant_agents:
-        domain = agent.replace("_architect", "")
-        task_description = f"""
-        Based on the user problem: "{user_problem}"
-        
-        Your specific task as {domain_descriptions[agent]}:
-        - Analyze the {domain} requirements for this problem
-        - Design appropriate {domain} solutions using AWS services
-        - Provide detailed configuration recommendations
-        - Consider cost, security, and performance implications
-        - Use web search for latest pricing and best practices
-        
-        Focus specifically on {domain} aspects of the architecture.
-        """
+        domain = AGENT_TO_DOMAIN[agent]
+        task_description = partial_template.format(domain_desc=_DOMAIN_DESCRIPTIONS[agent], domain=domain)
         
         decomposed_tasks[domain] = {
             "task_description": task_description,
@@ -102,6 +114,7 @@ def test_task_decomposition_logic():
     
     return len(decomposed_tasks) > 0 and len(task_assignments) > 0
 
+@buffered_output
 def test_domain_architect_logic():
     """Test that domain architects can access assigned tasks."""
     print("\n=== Testing Domain Architect Logic ===\n")
@@ -119,8 +132,9 @@ def test_domain_architect_logic():
     }
     
     # Test that domain architects can access their assigned tasks
-    compute_task = state.get("task_assignments", {}).get("compute", "")
-    network_task = state.get("task_assignments", {}).get("network", "")
+    assignments = state["task_assignments"]
+    compute_task = assignments.get("compute", "")
+    network_task = assignments.get("network", "")
     
     print(f"✓ Compute architect can access assigned task: {len(compute_task) > 0}")
     print(f"✓ Network architect can access assigned task: {len(network_task) > 0}")
@@ -143,18 +157,22 @@ def main():
     test2 = test_task_decomposition_logic()
     test3 = test_domain_architect_logic()
     
-    print("\n" + "=" * 50)
-    print("=== Test Results ===")
-    print(f"✓ State structure: {test1}")
-    print(f"✓ Task decomposition: {test2}")
-    print(f"✓ Domain architect access: {test3}")
+    print("\n".join((
+        "\n" + "=" * 50,
+        "=== Test Results ===",
+        f"✓ State structure: {test1}",
+        f"✓ Task decomposition: {test2}",
+        f"✓ Domain architect access: {test3}",
+    )))
     
     if test1 and test2 and test3:
-        print("\n🎉 SUCCESS: All tests passed!")
-        print("The modified logic should work correctly:")
-        print("  - Architect supervisor decomposes tasks")
-        print("  - Domain architects reference decomposed tasks")
-        print("  - Tasks are specific and actionable")
+        print("\n".join((
+            "\n🎉 SUCCESS: All tests passed!",
+            "The modified logic should work correctly:",
+            "  - Architect supervisor decomposes tasks",
+            "  - Domain architects reference decomposed tasks",
+            "  - Tasks are specific and actionable",
+        )))
     else:
         print("\n❌ FAILURE: Some tests failed")
     
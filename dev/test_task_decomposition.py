@@ -6,7 +6,11 @@ and that domain architects reference the decomposed tasks instead of user_proble
 """
 
 import asyncio
-from cloudy_intel_state import create_initial_state
+try:
+    import uvloop
+except ImportError:  # optional; the default asyncio loop works the same, just slower
+    uvloop = None
+from cloudy_intel_state import create_initial_state, apply_update
 from cloudy_intel_agents import architect_supervisor, compute_architect, network_architect
 from cloudy_intel_routing import determine_relevant_agents
 
@@ -30,22 +34,30 @@ async def test_task_decomposition():
     
     # Test architect supervisor
     print("=== Testing Architect Supervisor ===")
-    state_after_supervisor = await architect_supervisor(state)
+    state_after_supervisor = apply_update(state, await architect_supervisor(state))
     
-    print(f"Decomposed tasks after supervisor: {len(state_after_supervisor.get('decomposed_tasks', {}))}")
-    print(f"Task assignments after supervisor: {len(state_after_supervisor.get('task_assignments', {}))}")
+    assignments = state_after_supervisor['task_assignments']
+    print(f"Decomposed tasks after supervisor: {len(state_after_supervisor['decomposed_tasks'])}")
+    print(f"Task assignments after supervisor: {len(assignments)}")
     
     # Print task assignments
-    for domain, task in state_after_supervisor.get('task_assignments', {}).items():
+    for domain, task in assignments.items():
         print(f"\n{domain.upper()} Task Assignment:")
         print(f"  {task[:100]}..." if len(task) > 100 else f"  {task}")
     
     print(f"\nActive agents: {state_after_supervisor.get('active_agents', [])}")
     print()
     
+    # The domain architects only read the supervisor's state and return partial
+    # updates, so both can run concurrently against the same state.
+    compute_update, network_update = await asyncio.gather(
+        compute_architect(state_after_supervisor),
+        network_architect(state_after_supervisor),
+    )
+    
     # Test domain architect (compute)
     print("=== Testing Compute Architect ===")
-    state_after_compute = await compute_architect(state_after_supervisor)
+    state_after_compute = apply_update(state_after_supervisor, compute_update)
     
     compute_component = state_after_compute.get('architecture_components', {}).get('compute', {})
     print(f"Compute architect completed: {'compute_architect' in state_after_compute.get('completed_agents', [])}")
@@ -55,7 +67,7 @@ async def test_task_decomposition():
     
     # Test domain architect (network)
     print("=== Testing Network Architect ===")
-    state_after_network = await network_architect(state_after_supervisor)
+    state_after_network = apply_update(state_after_supervisor, network_update)
     
     network_component = state_after_network.get('architecture_components', {}).get('network', {})
     print(f"Network architect completed: {'network_architect' in state_after_network.get('completed_agents', [])}")
@@ -67,7 +79,7 @@ async def test_task_decomposition():
     print("=== Verification ===")
     
     # Check that supervisor created task assignments
-    has_task_assignments = len(state_after_supervisor.get('task_assignments', {})) > 0
+    has_task_assignments = len(assignments) > 0
     print(f"✓ Supervisor created task assignments: {has_task_assignments}")
     
     # Check that domain architects used assigned tasks
@@ -84,16 +96,24 @@ async def test_task_decomposition():
     
     print("\n=== Test Summary ===")
     if has_task_assignments and compute_used_assigned_task and network_used_assigned_task and tasks_are_specific:
-        print("✅ SUCCESS: Task decomposition logic is working correctly!")
-        print("   - Architect supervisor decomposes tasks")
-        print("   - Domain architects reference decomposed tasks")
-        print("   - Tasks are specific and actionable")
+        print("\n".join((
+            "✅ SUCCESS: Task decomposition logic is working correctly!",
+            "   - Architect supervisor decomposes tasks",
+            "   - Domain architects reference decomposed tasks",
+            "   - Tasks are specific and actionable",
+        )))
     else:
         print("❌ FAILURE: Task decomposition logic needs fixes")
     
     return state_after_network
 
 if __name__ == "__main__":
-    # Run the test
-    result = asyncio.run(test_task_decomposition())
-    print(f"\nFinal state keys: {list(result.keys())}")
+    # One loop for every async test in this script, rather than one per asyncio.run
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        result = loop.run_until_complete(test_task_decomposition())
+        print(f"\nFinal state keys: {list(result.keys())}")
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
@@ -1,10 +1,42 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from langchain_core.tools import Tool
 from langchain_community.utilities import GoogleSerperAPIWrapper
 
-serper = GoogleSerperAPIWrapper()
+# Search results are reused for an hour; architects repeat pricing/best-practice queries
+SEARCH_CACHE_MAXSIZE = 1024
+SEARCH_CACHE_TTL_SECONDS = 3600
+
+_search_cache: "OrderedDict[str, tuple]" = OrderedDict()  # normalized query -> (expires_at, result)
+_search_cache_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def get_serper() -> GoogleSerperAPIWrapper:
+    # Built on first search, so importing this module needs no SERPER_API_KEY
+    return GoogleSerperAPIWrapper()
+
+def _web_search(query: str) -> str:
+    """Run a Serper search, answering repeats of a query from a TTL'd LRU cache."""
+    key = " ".join(query.lower().split())
+    now = time.monotonic()
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is not None and entry[0] > now:
+            _search_cache.move_to_end(key)
+            return entry[1]
+
+    result = get_serper().run(query)
+    with _search_cache_lock:
+        _search_cache[key] = (now + SEARCH_CACHE_TTL_SECONDS, result)
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > SEARCH_CACHE_MAXSIZE:
+            _search_cache.popitem(last=False)
+    return result
 
 tool_web_search = Tool(
         name="web_search",
-        func=serper.run,
+        func=_web_search,
         description="Useful for when you need more information from an online search",
     )